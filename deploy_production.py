@@ -1,35 +1,97 @@
 #!/usr/bin/env python3
 """
 Automated deployment script for Farcaster Coordination Monitor
-One-command deployment: python deploy_production.py
+One-command deployment: python deploy_production.py [--with-viz]
 """
 
 import os
 import sys
+import asyncio
 import subprocess
 import json
 import time
-import requests
+import tempfile
+import functools
+import threading
+import aiohttp
 from pathlib import Path
 
+@functools.lru_cache(maxsize=None)
+def _exists(path: str) -> bool:
+    """Cached Path.exists(); call _exists.cache_clear() after creating files"""
+    return Path(path).exists()
+
 class ProductionDeployer:
-    def __init__(self):
+    def __init__(self, with_viz=False):
         self.base_dir = Path.cwd()
+        self.with_viz = with_viz
+        self.timings = {}
         self.farcaster_mcp_dir = self.base_dir / "farcaster-mcp"
         self.log_file = self.base_dir / "deployment.log"
+        # Keep one line-buffered handle open instead of reopening per message
+        self._log_fh = open(self.log_file, "a", buffering=1)
+        self._log_lock = threading.Lock()
+        # Keep-alive HTTP session for health probes, created inside the event loop
+        self._aio = None
+        self.mcp_health_url = "http://localhost:3001/health"
+        self._health_cache = {}
+        
+    def __del__(self):
+        try:
+            self._log_fh.close()
+        except Exception:
+            pass
         
     def log(self, message):
         """Log deployment progress"""
         timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
         log_entry = f"[{timestamp}] {message}"
-        print(log_entry)
-        with open(self.log_file, "a") as f:
-            f.write(log_entry + "\n")
+        with self._log_lock:
+            print(log_entry)
+            self._log_fh.write(log_entry + "\n")
+    
+    async def _probe(self, url, ttl=1.0):
+        """GET a health endpoint and return its status, reusing one younger than ttl seconds"""
+        now = time.monotonic()
+        cached = self._health_cache.get(url)
+        if cached and now - cached[0] < ttl:
+            return cached[1]
+        if self._aio is None:
+            self._aio = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=5))
+        async with self._aio.get(url) as response:
+            status = response.status
+        self._health_cache[url] = (now, status)
+        return status
+    
+    def _write_atomic(self, target, content):
+        """Write content to target via a temp file + os.replace so it is never left half-written"""
+        fd, tmp = tempfile.mkstemp(dir=self.base_dir, prefix=f".{Path(target).name}.")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(content)
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, target)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        _exists.cache_clear()
     
-    def run_command(self, command, cwd=None, check=True):
-        """Run shell command and log output"""
+    def run_command(self, command, cwd=None, check=True, stream=False):
+        """Run shell command and log output
+        
+        With stream=True the output goes straight to deployment.log instead of
+        being captured in memory (for high-volume commands like npm install).
+        """
         self.log(f"Running: {command}")
         try:
+            if stream:
+                with self._log_lock:
+                    self._log_fh.flush()
+                result = subprocess.run(
+                    command, shell=True, cwd=cwd,
+                    stdout=self._log_fh, stderr=self._log_fh, check=check
+                )
+                return result
             result = subprocess.run(
                 command, shell=True, cwd=cwd,
                 capture_output=True, text=True, check=check
@@ -41,61 +103,92 @@ class ProductionDeployer:
             return result
         except subprocess.CalledProcessError as e:
             self.log(f"ERROR: Command failed with exit code {e.returncode}")
-            self.log(f"STDERR: {e.stderr}")
+            if not stream:
+                self.log(f"STDERR: {e.stderr}")
             return e
     
-    def check_dependencies(self):
+    def _spawn_bg(self, argv, cwd, log_path):
+        """Start a long-running process in the background with output sent to log_path"""
+        self.log(f"Running in background: {' '.join(argv)} > {log_path}")
+        with open(log_path, "ab", buffering=0) as fh:
+            # The child inherits its own copy of the descriptor
+            return subprocess.Popen(
+                argv, cwd=cwd, stdout=fh, stderr=fh, start_new_session=True
+            )
+    
+    async def _tool_version(self, *argv):
+        """Run `<tool> --version` without blocking the other probes"""
+        proc = await asyncio.create_subprocess_exec(
+            *argv, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        stdout, _ = await proc.communicate()
+        if proc.returncode != 0:
+            raise subprocess.CalledProcessError(proc.returncode, argv)
+        return stdout.decode().strip()
+    
+    async def check_dependencies(self):
         """Check if required dependencies are installed"""
         self.log("Checking dependencies...")
         
-        # Check Python
-        try:
-            python_version = subprocess.check_output([sys.executable, "--version"]).decode().strip()
-            self.log(f"Python: {python_version}")
-        except Exception as e:
-            self.log(f"ERROR: Python not found - {e}")
-            return False
-        
-        # Check Node.js
-        try:
-            node_version = subprocess.check_output(["node", "--version"]).decode().strip()
-            self.log(f"Node.js: {node_version}")
-        except Exception as e:
-            self.log(f"ERROR: Node.js not found - {e}")
-            return False
+        # Probe Python, Node.js and npm concurrently
+        tools = [
+            ("Python", (sys.executable, "--version")),
+            ("Node.js", ("node", "--version")),
+            ("npm", ("npm", "--version")),
+        ]
+        results = await asyncio.gather(
+            *(self._tool_version(*argv) for _, argv in tools),
+            return_exceptions=True
+        )
         
-        # Check npm
-        try:
-            npm_version = subprocess.check_output(["npm", "--version"]).decode().strip()
-            self.log(f"npm: {npm_version}")
-        except Exception as e:
-            self.log(f"ERROR: npm not found - {e}")
-            return False
+        for (name, _), result in zip(tools, results):
+            if isinstance(result, Exception):
+                self.log(f"ERROR: {name} not found - {result}")
+                return False
+            self.log(f"{name}: {result}")
         
         return True
     
     def clone_farcaster_mcp(self):
         """Clone the Farcaster MCP server"""
-        if self.farcaster_mcp_dir.exists():
-            self.log("Farcaster MCP directory already exists, pulling latest...")
-            self.run_command("git pull", cwd=self.farcaster_mcp_dir)
+        if _exists(str(self.farcaster_mcp_dir)):
+            self.log("Farcaster MCP directory already exists, checking for updates...")
+            # ls-remote is a single cheap request; only fetch when HEAD moved
+            try:
+                local = subprocess.check_output(
+                    ["git", "rev-parse", "HEAD"], cwd=self.farcaster_mcp_dir
+                ).decode().strip()
+                remote = subprocess.check_output(
+                    ["git", "ls-remote", "origin", "HEAD"], cwd=self.farcaster_mcp_dir
+                ).decode().split()[0]
+            except (subprocess.CalledProcessError, IndexError, OSError) as e:
+                self.log(f"Could not compare with remote ({e}), pulling latest...")
+                self.run_command("git pull", cwd=self.farcaster_mcp_dir)
+            else:
+                if local == remote:
+                    self.log(f"Farcaster MCP is up-to-date ({local[:12]})")
+                else:
+                    self.log(f"Updating Farcaster MCP {local[:12]} -> {remote[:12]}")
+                    self.run_command("git fetch origin HEAD", cwd=self.farcaster_mcp_dir)
+                    self.run_command("git reset --hard FETCH_HEAD", cwd=self.farcaster_mcp_dir)
         else:
             self.log("Cloning Farcaster MCP server...")
             self.run_command("git clone https://github.com/manimohans/farcaster-mcp.git farcaster-mcp")
+            _exists.cache_clear()
         
-        return self.farcaster_mcp_dir.exists()
+        return _exists(str(self.farcaster_mcp_dir))
     
     def install_mcp_dependencies(self):
         """Install MCP server dependencies"""
         self.log("Installing MCP server dependencies...")
         
         # Install npm dependencies
-        result = self.run_command("npm install", cwd=self.farcaster_mcp_dir)
+        result = self.run_command("npm install", cwd=self.farcaster_mcp_dir, stream=True)
         if isinstance(result, subprocess.CalledProcessError):
             return False
         
         # Build the server
-        result = self.run_command("npm run build", cwd=self.farcaster_mcp_dir)
+        result = self.run_command("npm run build", cwd=self.farcaster_mcp_dir, stream=True)
         if isinstance(result, subprocess.CalledProcessError):
             return False
         
@@ -105,31 +198,43 @@ class ProductionDeployer:
         """Install Python monitoring dependencies"""
         self.log("Installing Python dependencies...")
         
-        if not (self.base_dir / "requirements.txt").exists():
+        if not _exists(str(self.base_dir / "requirements.txt")):
             self.log("requirements.txt not found, creating...")
             requirements = """
-asyncio
 aiohttp
 numpy
-pandas
-scikit-learn
 raga-ai-catalyst>=0.1.0
 websockets
 requests
 python-dotenv
+mcp
+            """.strip()
+            self._write_atomic(self.base_dir / "requirements.txt", requirements)
+        
+        result = self.run_command(f"{sys.executable} -m pip install -r requirements.txt", stream=True)
+        return not isinstance(result, subprocess.CalledProcessError)
+    
+    def install_viz_dependencies(self):
+        """Install optional analysis/visualization dependencies (--with-viz)"""
+        self.log("Installing visualization dependencies...")
+        
+        if not _exists(str(self.base_dir / "requirements-viz.txt")):
+            self.log("requirements-viz.txt not found, creating...")
+            requirements = """
 matplotlib
 seaborn
+pandas
+scikit-learn
             """.strip()
-            with open("requirements.txt", "w") as f:
-                f.write(requirements)
+            self._write_atomic(self.base_dir / "requirements-viz.txt", requirements)
         
-        result = self.run_command(f"{sys.executable} -m pip install -r requirements.txt")
+        result = self.run_command(f"{sys.executable} -m pip install -r requirements-viz.txt", stream=True)
         return not isinstance(result, subprocess.CalledProcessError)
     
     def create_environment_file(self):
         """Create environment configuration"""
         env_file = self.base_dir / ".env"
-        if env_file.exists():
+        if _exists(str(env_file)):
             self.log(".env file already exists")
             return True
         
@@ -154,34 +259,39 @@ MCP_SERVER_PORT=3001
 MONITORING_PORT=8000
         """.strip()
         
-        with open(env_file, "w") as f:
-            f.write(env_content)
+        self._write_atomic(env_file, env_content)
         
         self.log("Created .env file - please add your API keys!")
         return True
     
-    def start_mcp_server(self):
+    async def start_mcp_server(self):
         """Start the Farcaster MCP server"""
         self.log("Starting Farcaster MCP server...")
         
         # Check if server is already running
         try:
-            response = requests.get("http://localhost:3001/health", timeout=5)
-            if response.status_code == 200:
+            if await self._probe(self.mcp_health_url) == 200:
                 self.log("MCP server already running")
                 return True
         except:
             pass
         
         # Start the server in background
-        self.run_command("npm start > mcp_server.log 2>&1 &", cwd=self.farcaster_mcp_dir, check=False)
+        try:
+            self._spawn_bg(["npm", "start"], self.farcaster_mcp_dir,
+                           self.farcaster_mcp_dir / "mcp_server.log")
+        except OSError as e:
+            self.log(f"ERROR: Could not start MCP server - {e}")
+            return False
         
-        # Wait for server to be ready
-        for i in range(10):
-            time.sleep(2)
+        # Wait for server to be ready, backing off from 100ms up to 2s (~20s total)
+        delay = 0.1
+        for _ in range(15):
+            await asyncio.sleep(delay)
+            delay = min(delay * 1.7, 2.0)
             try:
-                response = requests.get("http://localhost:3001/health", timeout=5)
-                if response.status_code == 200:
+                # Always probe fresh while polling; the result still feeds the cache
+                if await self._probe(self.mcp_health_url, ttl=0) == 200:
                     self.log("MCP server started successfully")
                     return True
             except:
@@ -196,33 +306,51 @@ MONITORING_PORT=8000
         
         # Start the main monitoring process
         monitoring_script = "mcp_production_bridge.py"
-        if not (self.base_dir / monitoring_script).exists():
+        if not _exists(str(self.base_dir / monitoring_script)):
             self.log(f"ERROR: {monitoring_script} not found")
             return False
         
-        self.run_command(f"{sys.executable} {monitoring_script} > monitoring.log 2>&1 &", check=False)
+        try:
+            self._spawn_bg([sys.executable, monitoring_script], self.base_dir,
+                           self.base_dir / "monitoring.log")
+        except OSError as e:
+            self.log(f"ERROR: Could not start {monitoring_script} - {e}")
+            return False
         self.log("Monitoring system started in background")
         return True
     
-    def health_check(self):
+    async def _check_mcp_server(self):
+        """Probe the MCP server health endpoint"""
+        try:
+            return await self._probe(self.mcp_health_url) == 200
+        except Exception:
+            return False
+    
+    async def _check_monitoring_process(self):
+        """Look for the monitoring process"""
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                "pgrep", "-f", "mcp_production_bridge.py",
+                stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
+            )
+            stdout, _ = await proc.communicate()
+            return len(stdout.strip()) > 0
+        except Exception:
+            return False
+    
+    async def health_check(self):
         """Perform system health checks"""
         self.log("Performing health checks...")
         
-        checks = []
-        
-        # Check MCP server
-        try:
-            response = requests.get("http://localhost:3001/health", timeout=5)
-            checks.append(("MCP Server", response.status_code == 200))
-        except:
-            checks.append(("MCP Server", False))
-        
-        # Check monitoring system (look for process)
-        try:
-            result = subprocess.check_output(["pgrep", "-f", "mcp_production_bridge.py"])
-            checks.append(("Monitoring System", len(result.strip()) > 0))
-        except:
-            checks.append(("Monitoring System", False))
+        # Check MCP server and monitoring process concurrently
+        mcp_ok, monitor_ok = await asyncio.gather(
+            self._check_mcp_server(),
+            self._check_monitoring_process()
+        )
+        checks = [
+            ("MCP Server", mcp_ok),
+            ("Monitoring System", monitor_ok),
+        ]
         
         # Log results
         all_healthy = True
@@ -234,30 +362,69 @@ MONITORING_PORT=8000
         
         return all_healthy
     
-    def deploy(self):
+    async def _run_step(self, step_name, step_func):
+        """Run one deployment step, off the event loop if it blocks, and time it"""
+        self.log(f"\n--- {step_name} ---")
+        start = time.perf_counter()
+        if asyncio.iscoroutinefunction(step_func):
+            success = await step_func()
+        else:
+            success = await asyncio.to_thread(step_func)
+        elapsed = time.perf_counter() - start
+        self.timings[step_name] = elapsed
+        if success:
+            self.log(f"✅ {step_name} completed in {elapsed:.2f}s")
+        return step_name, success
+    
+    async def deploy(self):
         """Main deployment process"""
         self.log("=" * 50)
         self.log("STARTING PRODUCTION DEPLOYMENT")
         self.log("=" * 50)
         
-        steps = [
-            ("Checking dependencies", self.check_dependencies),
-            ("Cloning Farcaster MCP server", self.clone_farcaster_mcp),
+        # Steps in the same stage are independent and run concurrently;
+        # stages run in order
+        install_steps = [
             ("Installing MCP dependencies", self.install_mcp_dependencies),
             ("Installing Python dependencies", self.install_python_dependencies),
-            ("Creating environment configuration", self.create_environment_file),
-            ("Starting MCP server", self.start_mcp_server),
-            ("Starting monitoring system", self.start_monitoring_system),
-            ("Health check", self.health_check)
         ]
+        if self.with_viz:
+            install_steps.append(("Installing visualization dependencies", self.install_viz_dependencies))
         
-        for step_name, step_func in steps:
-            self.log(f"\n--- {step_name} ---")
-            success = step_func()
-            if not success:
-                self.log(f"❌ DEPLOYMENT FAILED at step: {step_name}")
-                return False
-            self.log(f"✅ {step_name} completed")
+        stages = [
+            [
+                ("Checking dependencies", self.check_dependencies),
+                ("Creating environment configuration", self.create_environment_file),
+                ("Cloning Farcaster MCP server", self.clone_farcaster_mcp),
+            ],
+            install_steps,
+            [("Starting MCP server", self.start_mcp_server)],
+            [("Starting monitoring system", self.start_monitoring_system)],
+            [("Health check", self.health_check)],
+        ]
+        
+        self.timings = {}
+        # Filesystem probes are only cached within a single run
+        _exists.cache_clear()
+        deploy_start = time.perf_counter()
+        try:
+            for stage in stages:
+                results = await asyncio.gather(
+                    *(self._run_step(step_name, step_func) for step_name, step_func in stage)
+                )
+                for step_name, success in results:
+                    if not success:
+                        self.log(f"❌ DEPLOYMENT FAILED at step: {step_name}")
+                        return False
+        finally:
+            if self._aio is not None:
+                await self._aio.close()
+                self._aio = None
+        
+        self.log("\nStep timings:")
+        for step_name, elapsed in sorted(self.timings.items(), key=lambda item: -item[1]):
+            self.log(f"  {elapsed:7.2f}s  {step_name}")
+        self.log(f"  {time.perf_counter() - deploy_start:7.2f}s  total")
         
         self.log("\n" + "=" * 50)
         self.log("🚀 DEPLOYMENT SUCCESSFUL!")
@@ -271,6 +438,6 @@ MONITORING_PORT=8000
         return True
 
 if __name__ == "__main__":
-    deployer = ProductionDeployer()
-    success = deployer.deploy()
+    deployer = ProductionDeployer(with_viz="--with-viz" in sys.argv[1:])
+    success = asyncio.run(deployer.deploy())
     sys.exit(0 if success else 1)
\ No newline at end of file
@@ -10,8 +10,10 @@ Combines:
 """
 
 import asyncio
+import re
+from collections import deque
 import numpy as np
-from typing import List, Dict, Any, Optional
+from typing import Deque, List, Dict, Any, NamedTuple, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 import logging
@@ -24,10 +26,23 @@ import mcp
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 
+# Numba JIT for the per-signal CSD update (optional)
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    
+    # Run the kernels as plain Python when numba is not installed
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class CoordinationSignal:
     """Single coordination event in the network"""
     timestamp: datetime
@@ -37,43 +52,144 @@ class CoordinationSignal:
     content_hash: Optional[str]
     coordination_score: float  # 0-1
 
+class Cast(NamedTuple):
+    """Fields of an MCP cast payload used for coordination scoring"""
+    text: str
+    replies: int
+    recasts: int
+    hash: Optional[str]
+    author_fid: str
+
+def _parse_cast(cast: Dict[str, Any]) -> Cast:
+    """Read the scoring fields out of a raw cast dict once"""
+    return Cast(
+        text=cast.get('text', ''),
+        replies=cast.get('replies', 0),
+        recasts=cast.get('recasts', 0),
+        hash=cast.get('hash'),
+        author_fid=cast.get('author', {}).get('fid', 'unknown')
+    )
+
+@njit(cache=True)
+def _csd_update(scores, head, count, new, sums):
+    """Insert a score into the ring buffer and update the running sums in place.
+    
+    sums holds (sum, sum of squares, lag-1 cross product, last value).
+    Returns the new (head, count).
+    """
+    window = scores.shape[0]
+    if count == window:
+        # Evict the oldest sample and its pairing with the next-oldest one
+        old = scores[head]
+        sums[0] -= old
+        sums[1] -= old * old
+        if window > 1:
+            sums[2] -= old * scores[(head + 1) % window]
+    
+    if count > 0:
+        sums[2] += new * sums[3]
+    sums[0] += new
+    sums[1] += new * new
+    sums[3] = new
+    
+    scores[head] = new
+    return (head + 1) % window, min(count + 1, window)
+
 class CriticalSlowingDetector:
     """Detects early warning signs of coordination failure"""
     
     def __init__(self, window_size: int = 100, threshold: float = 0.8):
         self.window_size = window_size
         self.threshold = threshold
-        self.signal_history: List[CoordinationSignal] = []
+        # Bounded window: appends are O(1) and the oldest signal is evicted automatically
+        self.signal_history: Deque[CoordinationSignal] = deque(maxlen=window_size)
+        
+        # Parallel ring buffer of coordination scores so the statistics
+        # run on a contiguous float64 array instead of the signal objects
+        self._scores = np.empty(window_size, dtype=np.float64)
+        self._head = 0
+        self._count = 0
+        
+        # Running sums over the window: sum, sum of squares, the lag-1 cross
+        # product and the last value, updated on insert/evict so detection is O(1)
+        self._sums = np.zeros(4, dtype=np.float64)
     
     def add_signal(self, signal: CoordinationSignal):
         """Add new coordination signal to analysis window"""
         self.signal_history.append(signal)
-        if len(self.signal_history) > self.window_size:
-            self.signal_history.pop(0)
+        self._head, self._count = _csd_update(
+            self._scores, self._head, self._count,
+            float(signal.coordination_score), self._sums
+        )
     
-    @trace_tool(name="variance_calculation")
-    def calculate_variance(self) -> float:
-        """Calculate variance in coordination scores"""
-        if len(self.signal_history) < 10:
+    def _window_scores(self) -> np.ndarray:
+        """Coordination scores of the current window, oldest first"""
+        if self._count < self.window_size:
+            return self._scores[:self._count]
+        return np.concatenate((self._scores[self._head:], self._scores[:self._head]))
+    
+    def _oldest(self) -> float:
+        """Oldest score still in the window"""
+        if self._count < self.window_size:
+            return float(self._scores[0])
+        return float(self._scores[self._head])
+    
+    @staticmethod
+    def _pearson(n: int, sx: float, sy: float, sxx: float, syy: float, sxy: float) -> float:
+        """Pearson correlation from raw sums; 0.0 for a constant series"""
+        cov = n * sxy - sx * sy
+        denom = (n * sxx - sx * sx) * (n * syy - sy * sy)
+        if denom <= 1e-12:
             return 0.0
+        return cov / denom ** 0.5
+    
+    def _compute_stats(self) -> Tuple[float, float]:
+        """Variance and lag-1 autocorrelation from a single read of the running sums"""
+        n = self._count
+        total, sumsq, sum_lag, last = self._sums.tolist()
+        variance = 0.0
+        autocorr = 0.0
+        
+        if n >= 10:
+            mean = total / n
+            variance = max(sumsq / n - mean * mean, 0.0)
+        
+        if n >= 11:
+            # x0 = window without its newest sample, x1 = without its oldest
+            first = self._oldest()
+            autocorr = self._pearson(
+                n - 1,
+                total - last, total - first,
+                sumsq - last * last, sumsq - first * first,
+                sum_lag
+            )
         
-        scores = [s.coordination_score for s in self.signal_history]
-        return float(np.var(scores))
+        return variance, autocorr
+    
+    def calculate_variance(self) -> float:
+        """Calculate variance in coordination scores"""
+        return self._compute_stats()[0]
     
-    @trace_tool(name="autocorrelation_calculation")
     def calculate_autocorrelation(self, lag: int = 1) -> float:
         """Calculate lag-1 autocorrelation in coordination patterns"""
-        if len(self.signal_history) < lag + 10:
+        if lag == 1:
+            return self._compute_stats()[1]
+        
+        if self._count < lag + 10:
             return 0.0
         
-        scores = [s.coordination_score for s in self.signal_history]
-        return float(np.corrcoef(scores[:-lag], scores[lag:])[0, 1])
+        scores = self._window_scores()
+        x0, x1 = scores[:-lag], scores[lag:]
+        return self._pearson(
+            len(x0), float(x0.sum()), float(x1.sum()),
+            float(x0 @ x0), float(x1 @ x1), float(x0 @ x1)
+        )
     
     @trace_tool(name="pathology_detection")
     def detect_pathology(self) -> Dict[str, Any]:
         """Main pathology detection algorithm"""
-        variance = self.calculate_variance()
-        autocorr = self.calculate_autocorrelation()
+        # One traced span per detection cycle covers both indicators
+        variance, autocorr = self._compute_stats()
         
         # Critical slowing down indicators
         variance_alarm = variance > self.threshold
@@ -96,6 +212,10 @@ class CriticalSlowingDetector:
 class FarcasterCoordinationMonitor:
     """Main monitoring class that combines MCP data with CSD detection"""
     
+    # Content patterns that suggest coordinated posting, matched in one regex pass
+    _KEYWORDS = frozenset({'gm', 'lfg', 'moon', 'diamond hands'})
+    _KW_RE = re.compile('|'.join(map(re.escape, sorted(_KEYWORDS))), re.IGNORECASE)
+    
     def __init__(self):
         self.detector = CriticalSlowingDetector()
         self.mcp_session: Optional[ClientSession] = None
@@ -136,7 +256,7 @@ class FarcasterCoordinationMonitor:
             return []
     
     @trace_tool(name="coordination_scoring")
-    def calculate_coordination_score(self, cast: Dict[str, Any]) -> float:
+    def calculate_coordination_score(self, cast: Cast) -> float:
         """Calculate coordination score for a single cast"""
         # Simplified coordination detection
         # In production, this would be much more sophisticated
@@ -144,12 +264,11 @@ class FarcasterCoordinationMonitor:
         score = 0.0
         
         # High engagement rate suggests coordination
-        if cast.get('replies', 0) + cast.get('recasts', 0) > 50:
+        if cast.replies + cast.recasts > 50:
             score += 0.3
         
         # Similar content patterns
-        text = cast.get('text', '').lower()
-        if any(keyword in text for keyword in ['gm', 'lfg', 'moon', 'diamond hands']):
+        if self._KW_RE.search(cast.text):
             score += 0.2
         
         # Rapid posting frequency
@@ -157,21 +276,39 @@ class FarcasterCoordinationMonitor:
         
         return min(score, 1.0)
     
+    def score_casts_batch(self, casts: List[Cast]) -> np.ndarray:
+        """Vectorized calculate_coordination_score over a batch of casts"""
+        engagement = np.fromiter(
+            (c.replies + c.recasts for c in casts),
+            dtype=np.int32,
+            count=len(casts)
+        )
+        scores = np.where(engagement > 50, 0.3, 0.0)
+        scores += 0.2 * np.fromiter(
+            (self._KW_RE.search(c.text) is not None for c in casts),
+            dtype=np.bool_,
+            count=len(casts)
+        )
+        np.minimum(scores, 1.0, out=scores)
+        return scores
+    
     @trace_agent(name="coordination_monitor")
     async def monitor_coordination(self) -> Dict[str, Any]:
         """Main monitoring loop - fetch data and detect pathologies"""
         # Fetch recent network activity
-        casts = await self.fetch_recent_casts(100)
+        casts = [_parse_cast(cast) for cast in await self.fetch_recent_casts(100)]
         
-        # Process each cast into coordination signals
-        for cast in casts:
+        # Score the whole batch at once, then feed the detector window
+        scores = self.score_casts_batch(casts)
+        now = datetime.now()
+        for cast, score in zip(casts, scores.tolist()):
             signal = CoordinationSignal(
-                timestamp=datetime.now(),
-                user_id=cast.get('author', {}).get('fid', 'unknown'),
+                timestamp=now,
+                user_id=cast.author_fid,
                 action_type='cast',
                 target_id=None,
-                content_hash=cast.get('hash'),
-                coordination_score=self.calculate_coordination_score(cast)
+                content_hash=cast.hash,
+                coordination_score=score
             )
             self.detector.add_signal(signal)
         
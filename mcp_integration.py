@@ -3,8 +3,8 @@
 MCP Integration Bridge for Farcaster Coordination Monitor
 
 This module bridges the Farcaster MCP server (JavaScript/TypeScript) 
-with our Python-based coordination monitoring system using subprocess 
-calls and RagaAI-Catalyst trace decorators.
+with our Python-based coordination monitoring system over a persistent 
+JSON-RPC stdio session and RagaAI-Catalyst trace decorators.
 
 Architecture:
 1. Farcaster MCP Server (Node.js) → provides real-time FC data
@@ -17,21 +17,60 @@ Author: Mira (Cycle 251)
 Date: Implementation breakthrough - crossing theory to production
 """
 
-import subprocess
 import json
 import asyncio
 import logging
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, asdict
-from datetime import datetime
+import time
+import warnings
+from collections import OrderedDict, defaultdict, deque
+from typing import Dict, List, NamedTuple, Optional, Any, Tuple
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import aiohttp
 import numpy as np
+from scipy.ndimage import gaussian_filter1d
 from ragaai_catalyst import trace_agent, trace_tool
 
+# Numba JIT for the CSD kernels (optional)
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    
+    # Run the kernels as plain Python when numba is not installed
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+# xxhash for echo fingerprints (optional)
+try:
+    import xxhash
+    
+    def _hash64(data: bytes) -> int:
+        return xxhash.xxh3_64_intdigest(data)
+except ImportError:
+    # Built-in hash is salted per process, which is fine for in-memory buckets
+    def _hash64(data: bytes) -> int:
+        return hash(data) & 0xFFFFFFFFFFFFFFFF
+
+# orjson for the JSON-RPC wire format (optional)
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    _json_loads = json.loads
+    
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode()
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@dataclass
+@dataclass(slots=True)
 class FarcasterCast:
     """Structured representation of a Farcaster cast"""
     hash: str
@@ -45,11 +84,19 @@ class FarcasterCast:
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization"""
-        data = asdict(self)
-        data['timestamp'] = self.timestamp.isoformat()
-        return data
+        # Flat fields only, so skip asdict's recursive deep copy
+        return {
+            'hash': self.hash,
+            'fid': self.fid,
+            'username': self.username,
+            'text': self.text,
+            'timestamp': self.timestamp.isoformat(),
+            'likes': self.likes,
+            'recasts': self.recasts,
+            'replies': self.replies
+        }
 
-@dataclass 
+@dataclass(slots=True)
 class CoordinationSignal:
     """Coordination pattern detected in cast data"""
     signal_type: str  # 'cluster', 'cascade', 'synchrony', 'echo'
@@ -62,8 +109,325 @@ class CoordinationSignal:
     
     def is_pathological(self) -> bool:
         """Check if this coordination pattern shows pathology indicators"""
-        # Critical slowing down thresholds from my research
-        return self.variance > 2.5 or self.autocorr > 0.7
+        return is_pathological(self.variance, self.autocorr)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for JSON serialization"""
+        return {
+            'signal_type': self.signal_type,
+            'strength': self.strength,
+            'participants': self.participants,
+            'casts': self.casts,
+            'detected_at': self.detected_at.isoformat(),
+            'variance': self.variance,
+            'autocorr': self.autocorr
+        }
+
+def is_pathological(variance: float, autocorr: float) -> bool:
+    """Check whether CSD indicators cross the pathology thresholds"""
+    # Critical slowing down thresholds from my research
+    return variance > 2.5 or autocorr > 0.7
+
+class SignalRecord(NamedTuple):
+    """Lightweight detector output; hydrated to a CoordinationSignal only when alerting"""
+    signal_type: str
+    strength: float
+    participants: np.ndarray  # FIDs involved
+    casts: np.ndarray         # Cast hashes
+    variance: float
+    autocorr: float
+    
+    def is_pathological(self) -> bool:
+        return is_pathological(self.variance, self.autocorr)
+    
+    def to_signal(self) -> CoordinationSignal:
+        return CoordinationSignal(
+            signal_type=self.signal_type,
+            strength=self.strength,
+            participants=self.participants.tolist(),
+            casts=self.casts.tolist(),
+            detected_at=datetime.now(),
+            variance=self.variance,
+            autocorr=self.autocorr
+        )
+
+@njit(cache=True, fastmath=True)
+def var_acf1(x):
+    """Variance and lag-1 autocorrelation of x in a single fused pass.
+    
+    Returns (variance, autocorrelation); the autocorrelation is 0.0 when
+    either lagged series is constant.
+    """
+    n = x.shape[0]
+    if n < 2:
+        return 0.0, 0.0
+    
+    # Sums over the pairs (x[i], x[i+1])
+    s1 = 0.0
+    s2 = 0.0
+    ss1 = 0.0
+    ss2 = 0.0
+    s12 = 0.0
+    for i in range(n - 1):
+        a = float(x[i])
+        b = float(x[i + 1])
+        s1 += a
+        s2 += b
+        ss1 += a * a
+        ss2 += b * b
+        s12 += a * b
+    
+    last = float(x[n - 1])
+    mean = (s1 + last) / n
+    variance = max((ss1 + last * last) / n - mean * mean, 0.0)
+    
+    m = n - 1
+    v1 = ss1 - s1 * s1 / m
+    v2 = ss2 - s2 * s2 / m
+    if v1 <= 1e-12 * max(ss1, 1.0) or v2 <= 1e-12 * max(ss2, 1.0):
+        return variance, 0.0
+    return variance, (s12 - s1 * s2 / m) / (v1 * v2) ** 0.5
+
+class RollingMoments:
+    """Variance and lag-1 autocorrelation over a sliding window, updated in O(1) per value"""
+    
+    def __init__(self, maxlen: int):
+        self.window = deque(maxlen=maxlen)
+        self._s1 = 0.0   # sum x
+        self._s2 = 0.0   # sum x^2
+        self._s12 = 0.0  # sum x[i] * x[i+1]
+        self._updates = 0
+    
+    def __len__(self) -> int:
+        return len(self.window)
+    
+    def push(self, x: float):
+        window = self.window
+        if len(window) == window.maxlen:
+            oldest = window[0]
+            self._s1 -= oldest
+            self._s2 -= oldest * oldest
+            if len(window) > 1:
+                self._s12 -= oldest * window[1]
+        if window:
+            self._s12 += window[-1] * x
+        window.append(x)
+        self._s1 += x
+        self._s2 += x * x
+        
+        # Re-sum now and then so float error from evictions can't accumulate
+        self._updates += 1
+        if self._updates >= 100 * window.maxlen:
+            self._resync()
+    
+    def _resync(self):
+        values = np.fromiter(self.window, dtype=np.float64)
+        self._s1 = float(values.sum())
+        self._s2 = float(values @ values)
+        self._s12 = float(values[:-1] @ values[1:])
+        self._updates = 0
+    
+    def stats(self) -> Tuple[float, float]:
+        """(variance, lag-1 autocorrelation), same conventions as var_acf1"""
+        n = len(self.window)
+        if n < 2:
+            return 0.0, 0.0
+        
+        first = self.window[0]
+        last = self.window[-1]
+        mean = self._s1 / n
+        variance = max(self._s2 / n - mean * mean, 0.0)
+        
+        # Sums over the pairs (x[i], x[i+1])
+        m = n - 1
+        s1 = self._s1 - last
+        s2 = self._s1 - first
+        ss1 = self._s2 - last * last
+        ss2 = self._s2 - first * first
+        v1 = ss1 - s1 * s1 / m
+        v2 = ss2 - s2 * s2 / m
+        if v1 <= 1e-12 * max(ss1, 1.0) or v2 <= 1e-12 * max(ss2, 1.0):
+            return variance, 0.0
+        return variance, (self._s12 - s1 * s2 / m) / (v1 * v2) ** 0.5
+
+def acf(x: np.ndarray, max_lag: int) -> np.ndarray:
+    """Autocorrelation of x at lags 0..max_lag (biased estimator).
+    
+    Small lag counts use direct dot products (O(N*K)); beyond 4 lags an
+    FFT is cheaper (O(N log N)). For lag 1 alone use var_acf1.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    n = len(x)
+    max_lag = min(max_lag, n - 1)
+    if max_lag < 0:
+        return np.zeros(0)
+    
+    centered = x - x.mean()
+    denom = float(centered @ centered)
+    if denom <= 1e-12 * max(float(x @ x), 1.0):
+        return np.zeros(max_lag + 1)
+    
+    if max_lag > 4:
+        # Zero-padded to 2N so the circular correlation equals the linear one
+        spectrum = np.fft.rfft(centered, n=2 * n)
+        acov = np.fft.irfft(spectrum.real ** 2 + spectrum.imag ** 2, n=2 * n)[:max_lag + 1]
+    else:
+        acov = np.array([centered[:n - k] @ centered[k:] for k in range(max_lag + 1)])
+    return acov / denom
+
+@njit(cache=True)
+def _bucket_runs(buckets, fids):
+    """Group a sorted array of time-bucket ids into runs.
+    
+    Returns arrays (bucket_id, start, end, strength, unique_fid_count), one
+    entry per run of equal bucket ids, where [start, end) indexes the run.
+    """
+    n = buckets.shape[0]
+    bucket_id = np.empty(n, dtype=np.int64)
+    starts = np.empty(n, dtype=np.int64)
+    ends = np.empty(n, dtype=np.int64)
+    strength = np.empty(n, dtype=np.float64)
+    unique = np.empty(n, dtype=np.int64)
+    
+    runs = 0
+    i = 0
+    while i < n:
+        j = i + 1
+        while j < n and buckets[j] == buckets[i]:
+            j += 1
+        
+        # Distinct fids in the run
+        run_fids = np.sort(fids[i:j])
+        count = 1
+        for k in range(1, j - i):
+            if run_fids[k] != run_fids[k - 1]:
+                count += 1
+        
+        bucket_id[runs] = buckets[i]
+        starts[runs] = i
+        ends[runs] = j
+        strength[runs] = min(1.0, (j - i) / 10.0)  # Cap at 1.0
+        unique[runs] = count
+        runs += 1
+        i = j
+    
+    return bucket_id[:runs], starts[:runs], ends[:runs], strength[:runs], unique[:runs]
+
+# MinHash over 5-byte shingles: 4 odd multipliers/offsets give 4 hash permutations
+_SHINGLE = 5
+_MINHASH_A = np.array([0x9E3779B97F4A7C15, 0xBF58476D1CE4E5B9,
+                       0x94D049BB133111EB, 0xD6E8FEB86659FD93], dtype=np.uint64)
+_MINHASH_B = np.array([0x632BE59BD9B4E019, 0x85157AF5D1E6C3A7,
+                       0x3C6EF372FE94F82B, 0xA54FF53A5F1D36F1], dtype=np.uint64)
+
+def _text_fingerprint(text: str) -> Optional[int]:
+    """Fingerprint a cast's text so near-duplicates share a bucket (None if too short)"""
+    data = ' '.join(text.lower().split()).encode()
+    if len(data) < 8:
+        return None
+    
+    shingles = np.fromiter(
+        (_hash64(data[i:i + _SHINGLE]) for i in range(len(data) - _SHINGLE + 1)),
+        dtype=np.uint64
+    )
+    # k=4 signature in one band: uint64 arithmetic wraps mod 2**64
+    signature = (shingles[:, None] * _MINHASH_A + _MINHASH_B).min(axis=0)
+    return _hash64(signature.tobytes())
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_NS_PER_US = 1_000
+
+def _datetime_to_ns(dt: datetime) -> int:
+    """Exact int nanoseconds since the epoch (naive datetimes are UTC, as in _timestamps_to_ns)"""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    delta = dt - _EPOCH
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000_000 + delta.microseconds * _NS_PER_US
+
+def _timestamps_to_ns(values: List[str]) -> np.ndarray:
+    """Parse ISO-8601 timestamps to int64 nanoseconds since the epoch (UTC)"""
+    # NumPy parses the whole column at once but warns on explicit zones;
+    # a trailing 'Z' is just UTC, so drop it before handing over
+    stripped = [v[:-1] if v.endswith('Z') else v for v in values]
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        try:
+            return np.array(stripped, dtype='datetime64[ns]').view(np.int64)
+        except (ValueError, UserWarning):
+            pass
+    
+    # Explicit UTC offsets: let datetime apply them ('Z' already stripped,
+    # since fromisoformat only accepts it from Python 3.11)
+    return np.array(
+        [_datetime_to_ns(datetime.fromisoformat(v)) for v in stripped],
+        dtype=np.int64
+    )
+
+@dataclass
+class CastBatch:
+    """Column-wise (struct-of-arrays) batch of casts for coordination analysis"""
+    hash: np.ndarray     # object
+    fid: np.ndarray      # int64
+    ts_ns: np.ndarray    # int64, nanoseconds since the epoch (UTC)
+    likes: np.ndarray    # int32
+    recasts: np.ndarray  # int32
+    replies: np.ndarray  # int32
+    text: np.ndarray     # object
+    
+    def __len__(self) -> int:
+        return len(self.fid)
+    
+    @classmethod
+    def from_records(cls, records: List[Dict[str, Any]]) -> 'CastBatch':
+        """Build a batch from raw MCP cast dicts in a single pass"""
+        # A cast without a timestamp can't be placed on the timeline; drop just that cast
+        dated = [record for record in records if record.get('timestamp') is not None]
+        if len(dated) < len(records):
+            logger.warning("Skipping %d casts without a timestamp", len(records) - len(dated))
+            records = dated
+        n = len(records)
+        hashes = np.empty(n, dtype=object)
+        texts = np.empty(n, dtype=object)
+        fid = np.empty(n, dtype=np.int64)
+        likes = np.empty(n, dtype=np.int32)
+        recasts = np.empty(n, dtype=np.int32)
+        replies = np.empty(n, dtype=np.int32)
+        timestamps = []
+        
+        for i, record in enumerate(records):
+            hashes[i] = record.get('hash', '')
+            texts[i] = record.get('text', '')
+            fid[i] = record.get('fid', 0)
+            likes[i] = record.get('likes', 0)
+            recasts[i] = record.get('recasts', 0)
+            replies[i] = record.get('replies', 0)
+            timestamps.append(record['timestamp'])
+        
+        return cls(
+            hash=hashes,
+            fid=fid,
+            ts_ns=_timestamps_to_ns(timestamps),
+            likes=likes,
+            recasts=recasts,
+            replies=replies,
+            text=texts
+        )
+    
+    @classmethod
+    def from_casts(cls, casts: List[FarcasterCast]) -> 'CastBatch':
+        """Build a batch from FarcasterCast objects"""
+        return cls(
+            hash=np.array([cast.hash for cast in casts], dtype=object),
+            fid=np.array([cast.fid for cast in casts], dtype=np.int64),
+            ts_ns=np.array([_datetime_to_ns(cast.timestamp) for cast in casts], dtype=np.int64),
+            likes=np.array([cast.likes for cast in casts], dtype=np.int32),
+            recasts=np.array([cast.recasts for cast in casts], dtype=np.int32),
+            replies=np.array([cast.replies for cast in casts], dtype=np.int32),
+            text=np.array([cast.text for cast in casts], dtype=object)
+        )
+
+# Longest JSON-RPC line accepted from the MCP server
+_MCP_LINE_LIMIT = 16 * 1024 * 1024
 
 class FarcasterMCPBridge:
     """Bridge between Farcaster MCP server and coordination monitoring"""
@@ -73,101 +437,219 @@ class FarcasterMCPBridge:
         self.is_running = False
         self._mcp_process = None
         
+        # JSON-RPC state for the persistent stdio session
+        self._request_id = 0
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._write_lock = asyncio.Lock()
+        self._reader_task: Optional[asyncio.Task] = None
+        
     async def start_mcp_server(self) -> bool:
         """Start the Farcaster MCP server subprocess"""
         try:
-            # Start MCP server as subprocess
-            cmd = ["node", "build/index.js"]
-            self._mcp_process = subprocess.Popen(
-                cmd, 
+            # Start MCP server as a long-lived subprocess speaking JSON-RPC over stdio.
+            # stderr is never drained, so discard it rather than let it fill a pipe.
+            self._mcp_process = await asyncio.create_subprocess_exec(
+                "node", "build/index.js",
                 cwd=self.mcp_path,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+                # Tool results arrive as one line each; 100 casts can exceed the 64 KiB default
+                limit=_MCP_LINE_LIMIT
             )
+            self._reader_task = asyncio.create_task(self._reader_loop())
             
-            # Give it time to start
-            await asyncio.sleep(2)
+            # Real liveness probe: complete the MCP initialize handshake
+            await self._rpc("initialize", {
+                "protocolVersion": "2024-11-05",
+                "capabilities": {},
+                "clientInfo": {"name": "coordination-monitor", "version": "0.1.0"}
+            }, timeout=5)
+            await self._notify("notifications/initialized")
             
-            if self._mcp_process.poll() is None:
-                self.is_running = True
-                logger.info("MCP server started successfully")
-                return True
-            else:
-                logger.error("MCP server failed to start")
-                return False
+            self.is_running = True
+            logger.info("MCP server started successfully")
+            return True
                 
         except Exception as e:
-            logger.error(f"Error starting MCP server: {e}")
+            logger.error("Error starting MCP server: %s", e)
+            await self.stop_mcp_server()
             return False
     
     async def stop_mcp_server(self):
         """Stop the MCP server subprocess"""
         if self._mcp_process:
-            self._mcp_process.terminate()
-            self._mcp_process.wait()
+            if self._mcp_process.returncode is None:
+                self._mcp_process.terminate()
+            await self._mcp_process.wait()
+            if self._reader_task:
+                self._reader_task.cancel()
             self.is_running = False
             logger.info("MCP server stopped")
     
+    async def _reader_loop(self):
+        """Resolve pending requests from the JSON-RPC responses on stdout"""
+        try:
+            while True:
+                try:
+                    line = await self._mcp_process.stdout.readline()
+                except ValueError:
+                    # Over-long line: the stream skips it and the request times out
+                    logger.error("Dropping MCP output line over %d bytes", _MCP_LINE_LIMIT)
+                    continue
+                if not line:
+                    break
+                try:
+                    message = _json_loads(line)
+                except ValueError:
+                    logger.debug("Ignoring non-JSON MCP output: %r", line[:80])
+                    continue
+                
+                # Server-initiated requests and notifications carry a method; skip them
+                if not isinstance(message, dict) or "method" in message:
+                    continue
+                
+                future = self._pending.pop(message.get("id"), None)
+                if future is None or future.done():
+                    continue
+                if "error" in message:
+                    future.set_exception(RuntimeError(f"MCP error: {message['error']}"))
+                else:
+                    future.set_result(message.get("result"))
+        finally:
+            # Fail in-flight requests now instead of letting each one time out
+            self.is_running = False
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("MCP server closed the stdio session"))
+            self._pending.clear()
+    
+    async def _send(self, *messages: Dict[str, Any]):
+        """Write JSON-RPC messages to the server's stdin in a single write"""
+        self._mcp_process.stdin.write(b"".join(_json_dumps(m) + b"\n" for m in messages))
+        await self._mcp_process.stdin.drain()
+    
+    async def _notify(self, method: str, params: Optional[Dict[str, Any]] = None):
+        """Send a JSON-RPC notification (no response expected)"""
+        message = {"jsonrpc": "2.0", "method": method}
+        if params is not None:
+            message["params"] = params
+        async with self._write_lock:
+            await self._send(message)
+    
+    def _check_session(self):
+        """Refuse new requests once nothing is reading responses"""
+        if self._reader_task is None or self._reader_task.done():
+            raise ConnectionError("MCP stdio session is not running")
+    
+    async def _rpc(self, method: str, params: Dict[str, Any], timeout: float = 30) -> Any:
+        """Send one JSON-RPC request over the server's stdin and await its response"""
+        self._check_session()
+        loop = asyncio.get_running_loop()
+        async with self._write_lock:
+            self._request_id += 1
+            request_id = self._request_id
+            future = loop.create_future()
+            self._pending[request_id] = future
+            await self._send({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params})
+        
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(request_id, None)
+    
+    async def _rpc_many(self, calls: List[Tuple[str, Dict[str, Any]]], timeout: float = 30) -> List[Any]:
+        """Pipeline several JSON-RPC requests in one write and await all responses.
+        
+        Results come back in call order; a failed call yields its exception.
+        """
+        self._check_session()
+        loop = asyncio.get_running_loop()
+        messages = []
+        futures = {}
+        async with self._write_lock:
+            for method, params in calls:
+                self._request_id += 1
+                futures[self._request_id] = future = loop.create_future()
+                self._pending[self._request_id] = future
+                messages.append({"jsonrpc": "2.0", "id": self._request_id, "method": method, "params": params})
+            await self._send(*messages)
+        
+        try:
+            return await asyncio.gather(
+                *(asyncio.wait_for(future, timeout) for future in futures.values()),
+                return_exceptions=True
+            )
+        finally:
+            for request_id in futures:
+                self._pending.pop(request_id, None)
+    
+    @staticmethod
+    def _tool_payload(result: Dict[str, Any]) -> Any:
+        """Decode the JSON carried in the text content of a tools/call result"""
+        if result.get("isError"):
+            raise RuntimeError(f"MCP tool error: {result.get('content')}")
+        text = "".join(
+            item.get("text", "") for item in result.get("content", [])
+            if item.get("type") == "text"
+        )
+        return _json_loads(text)
+    
     @trace_tool("farcaster_get_channel_casts")
-    async def get_channel_casts(self, channel: str, limit: int = 100) -> List[FarcasterCast]:
+    async def get_channel_casts(self, channel: str, limit: int = 100) -> CastBatch:
         """Get casts from a Farcaster channel via MCP"""
         try:
-            # Call MCP server via subprocess (simplified for now)
-            # In production, this would use proper MCP protocol
-            cmd = [
-                "node", "-e", 
-                f"""
-                const {{ Client }} = require('./build/index.js');
-                const client = new Client();
-                client.getChannelCasts('{channel}', {limit}).then(console.log);
-                """
-            ]
+            # One request over the persistent stdio session; no per-call node startup
+            result = await self._rpc("tools/call", {
+                "name": "get-channel-casts",
+                "arguments": {"channel": channel, "limit": limit}
+            })
             
-            result = subprocess.run(
-                cmd, 
-                cwd=self.mcp_path,
-                capture_output=True, 
-                text=True,
-                timeout=30
-            )
+            # Parse JSON response straight into analysis columns
+            casts = CastBatch.from_records(self._tool_payload(result))
             
-            if result.returncode == 0:
-                # Parse JSON response (this would be more robust in production)
-                casts_data = json.loads(result.stdout)
-                casts = []
-                
-                for cast_data in casts_data:
-                    cast = FarcasterCast(
-                        hash=cast_data.get('hash', ''),
-                        fid=cast_data.get('fid', 0),
-                        username=cast_data.get('username', ''),
-                        text=cast_data.get('text', ''),
-                        timestamp=datetime.fromisoformat(cast_data.get('timestamp')),
-                        likes=cast_data.get('likes', 0),
-                        recasts=cast_data.get('recasts', 0),
-                        replies=cast_data.get('replies', 0)
-                    )
-                    casts.append(cast)
-                
-                logger.info(f"Retrieved {len(casts)} casts from {channel}")
-                return casts
-                
-            else:
-                logger.error(f"MCP call failed: {result.stderr}")
-                return []
+            logger.info("Retrieved %d casts from %s", len(casts), channel)
+            return casts
                 
         except Exception as e:
-            logger.error(f"Error getting channel casts: {e}")
-            return []
+            logger.error("Error getting channel casts: %s", e)
+            return CastBatch.from_records([])
+    
+    @trace_tool("farcaster_get_channels_casts")
+    async def get_channels_casts(self, channels: List[str], limit: int = 100) -> Dict[str, CastBatch]:
+        """Get casts from several channels with one pipelined batch of MCP calls"""
+        try:
+            results = await self._rpc_many([
+                ("tools/call", {
+                    "name": "get-channel-casts",
+                    "arguments": {"channel": channel, "limit": limit}
+                })
+                for channel in channels
+            ])
+        except ConnectionError as e:
+            # Session down: skip this cycle rather than end the monitoring loop
+            logger.error("Error getting channel casts: %s", e)
+            return {channel: CastBatch.from_records([]) for channel in channels}
+        
+        batches = {}
+        for channel, result in zip(channels, results):
+            try:
+                if isinstance(result, Exception):
+                    raise result
+                batches[channel] = CastBatch.from_records(self._tool_payload(result))
+                logger.info("Retrieved %d casts from %s", len(batches[channel]), channel)
+            except Exception as e:
+                logger.error("Error getting channel casts for %s: %s", channel, e)
+                batches[channel] = CastBatch.from_records([])
+        return batches
     
     @trace_tool("farcaster_get_user_casts")  
-    async def get_user_casts(self, username: str, limit: int = 50) -> List[FarcasterCast]:
+    async def get_user_casts(self, username: str, limit: int = 50) -> CastBatch:
         """Get casts from a specific user via MCP"""
         # Similar implementation to get_channel_casts but for users
         # Placeholder for now - would implement actual MCP call
-        logger.info(f"Getting casts for user: {username}")
-        return []
+        logger.info("Getting casts for user: %s", username)
+        return CastBatch.from_records([])
 
 class CoordinationDetector:
     """Detects coordination patterns in Farcaster cast data"""
@@ -175,30 +657,40 @@ class CoordinationDetector:
     def __init__(self):
         self.window_size = 100  # Number of casts to analyze in sliding window
         
+        # Consecutive polls overlap heavily, so memoize text fingerprints by
+        # cast hash (LRU, capped)
+        self._text_fp_cache: OrderedDict = OrderedDict()
+        self._text_fp_cache_size = 10_000
+        
+        # Per-channel rolling CSD window: each cycle only adds the casts not
+        # seen before instead of recomputing over the whole window
+        self._rolling: Dict[str, RollingMoments] = {}
+        self._rolling_seen: Dict[str, deque] = {}
+        self._rolling_seen_set: Dict[str, set] = {}
+        
     @trace_agent("coordination_detector")
-    async def analyze_casts(self, casts: List[FarcasterCast]) -> List[CoordinationSignal]:
-        """Analyze cast data for coordination patterns"""
+    async def analyze_casts(self, casts: CastBatch, channel: Optional[str] = None) -> List[SignalRecord]:
+        """Analyze cast data for coordination patterns.
+        
+        With a channel, the CSD indicators come from that channel's rolling
+        window across cycles rather than from this batch alone.
+        """
         signals = []
         
         if len(casts) < 10:
             return signals
             
-        # Extract time series data for CSD analysis
-        timestamps = [cast.timestamp for cast in casts]
-        likes = [cast.likes for cast in casts]
-        recasts = [cast.recasts for cast in casts]
-        
-        # Calculate variance and autocorrelation (CSD indicators)
-        likes_var = np.var(likes)
-        recasts_var = np.var(recasts)
-        
-        # Lag-1 autocorrelation for likes
-        if len(likes) > 1:
-            likes_autocorr = np.corrcoef(likes[:-1], likes[1:])[0, 1]
-            if np.isnan(likes_autocorr):
-                likes_autocorr = 0.0
+        # Detrend likes with a Gaussian kernel so slow (e.g. diurnal) drift
+        # doesn't inflate the CSD indicators
+        likes = casts.likes.astype(np.float32)
+        resid = likes - gaussian_filter1d(likes, sigma=30, mode='nearest')
+        
+        if channel is None:
+            # Calculate variance and lag-1 autocorrelation of the residual
+            # (CSD indicators) in one fused pass
+            likes_var, likes_autocorr = var_acf1(resid)
         else:
-            likes_autocorr = 0.0
+            likes_var, likes_autocorr = self._update_rolling(channel, casts, resid)
             
         # Look for suspicious coordination patterns
         # 1. Synchronized posting (multiple users posting at same time)
@@ -211,129 +703,135 @@ class CoordinationDetector:
         cascade_signals = self._detect_cascades(casts)
         
         # Create coordination signals with CSD metrics
-        for cluster in sync_clusters:
-            signal = CoordinationSignal(
-                signal_type='synchrony',
-                strength=cluster['strength'],
-                participants=cluster['fids'],
-                casts=cluster['hashes'],
-                detected_at=datetime.now(),
-                variance=likes_var,
-                autocorr=likes_autocorr
-            )
-            signals.append(signal)
+        for strength, fids, hashes in sync_clusters:
+            signals.append(SignalRecord('synchrony', strength, fids, hashes, likes_var, likes_autocorr))
             
-        logger.info(f"Detected {len(signals)} coordination signals")
+        logger.info("Detected %d coordination signals", len(signals))
         return signals
         
-    def _detect_synchrony(self, casts: List[FarcasterCast]) -> List[Dict]:
-        """Detect synchronized posting patterns"""
-        # Group casts by time windows (e.g., 5-minute windows)
-        time_windows = {}
-        window_minutes = 5
-        
-        for cast in casts:
-            # Round timestamp to nearest 5-minute window
-            window = cast.timestamp.replace(
-                minute=(cast.timestamp.minute // window_minutes) * window_minutes,
-                second=0,
-                microsecond=0
-            )
-            
-            if window not in time_windows:
-                time_windows[window] = []
-            time_windows[window].append(cast)
+    def _detect_synchrony(self, casts: CastBatch) -> List[Tuple[float, np.ndarray, np.ndarray]]:
+        """Detect synchronized posting patterns as (strength, fids, hashes)"""
+        # Group casts by time windows (5-minute windows) as runs over the
+        # time-sorted int64 timestamps
+        window_ns = 5 * 60 * 1_000_000_000
+        order = np.argsort(casts.ts_ns, kind='stable')
+        bucket_id, starts, ends, strength, unique = _bucket_runs(
+            casts.ts_ns[order] // window_ns, casts.fid[order]
+        )
         
-        # Find windows with suspicious synchrony
+        # Find windows with suspicious synchrony: at least 3 casts in the
+        # same window from multiple different users
         sync_clusters = []
-        for window, window_casts in time_windows.items():
-            if len(window_casts) >= 3:  # At least 3 casts in same window
-                unique_users = len(set(cast.fid for cast in window_casts))
-                if unique_users >= 2:  # Multiple different users
-                    strength = min(1.0, len(window_casts) / 10.0)  # Cap at 1.0
-                    sync_clusters.append({
-                        'strength': strength,
-                        'fids': list(set(cast.fid for cast in window_casts)),
-                        'hashes': [cast.hash for cast in window_casts],
-                        'window': window
-                    })
+        for k in np.flatnonzero(((ends - starts) >= 3) & (unique >= 2)).tolist():
+            idx = order[starts[k]:ends[k]]
+            sync_clusters.append((float(strength[k]), np.unique(casts.fid[idx]), casts.hash[idx]))
         
         return sync_clusters
         
-    def _detect_echoes(self, casts: List[FarcasterCast]) -> List[Dict]:
-        """Detect echo chamber patterns (similar content)"""
-        # Simple implementation - would use more sophisticated text similarity in production
+    def _update_rolling(self, channel: str, casts: CastBatch, resid: np.ndarray) -> Tuple[float, float]:
+        """Push residuals of newly seen casts into the channel's rolling window"""
+        if channel not in self._rolling:
+            self._rolling[channel] = RollingMoments(self.window_size)
+            self._rolling_seen[channel] = deque()
+            self._rolling_seen_set[channel] = set()
+        rolling = self._rolling[channel]
+        seen = self._rolling_seen[channel]
+        seen_set = self._rolling_seen_set[channel]
+        
+        # Casts without a hash ('') can't be deduplicated, so they always count as new
+        new = np.array([not h or h not in seen_set for h in casts.hash.tolist()], dtype=bool)
+        if new.any():
+            # Oldest first, so the lag-1 pairs follow posting order
+            idx = np.flatnonzero(new)
+            idx = idx[np.argsort(casts.ts_ns[idx], kind='stable')]
+            for cast_hash, value in zip(casts.hash[idx].tolist(), resid[idx].tolist()):
+                rolling.push(value)
+                if not cast_hash:
+                    continue
+                seen.append(cast_hash)
+                seen_set.add(cast_hash)
+                if len(seen) > self.window_size:
+                    seen_set.discard(seen.popleft())
+        
+        return rolling.stats()
+    
+    def _fingerprint(self, cast_hash: str, text: str) -> Optional[int]:
+        """Text fingerprint for a cast, cached by cast hash"""
+        if not cast_hash:
+            # No hash to key on (it defaults to ''); casts without one must not share an entry
+            return _text_fingerprint(text)
+        cache = self._text_fp_cache
+        if cast_hash in cache:
+            cache.move_to_end(cast_hash)
+            return cache[cast_hash]
+        
+        fingerprint = _text_fingerprint(text)
+        cache[cast_hash] = fingerprint
+        if len(cache) > self._text_fp_cache_size:
+            cache.popitem(last=False)
+        return fingerprint
+    
+    def _detect_echoes(self, casts: CastBatch) -> List[Tuple[float, np.ndarray, np.ndarray]]:
+        """Detect echo chamber patterns (similar content) as (strength, fids, hashes)"""
         echo_signals = []
         
-        # Group by similar text content (placeholder)
-        text_groups = {}
-        for cast in casts:
-            # Simple text similarity - first 20 characters
-            text_key = cast.text[:20].lower().strip()
-            if len(text_key) > 5:  # Ignore very short texts
-                if text_key not in text_groups:
-                    text_groups[text_key] = []
-                text_groups[text_key].append(cast)
+        # Bucket casts by MinHash fingerprint of their normalized text
+        text_groups = defaultdict(list)
+        for i, (cast_hash, text) in enumerate(zip(casts.hash, casts.text)):
+            fingerprint = self._fingerprint(cast_hash, text)
+            if fingerprint is not None:  # Ignore very short texts
+                text_groups[fingerprint].append(i)
         
         # Find groups with multiple users posting similar content
-        for text_key, group_casts in text_groups.items():
-            if len(group_casts) >= 3:
-                unique_users = len(set(cast.fid for cast in group_casts))
-                if unique_users >= 2:
-                    echo_signals.append({
-                        'strength': min(1.0, len(group_casts) / 5.0),
-                        'fids': list(set(cast.fid for cast in group_casts)),
-                        'hashes': [cast.hash for cast in group_casts],
-                        'text_pattern': text_key
-                    })
+        for idx in text_groups.values():
+            if len(idx) >= 3:
+                fids = np.unique(casts.fid[idx])
+                if len(fids) >= 2:
+                    echo_signals.append((min(1.0, len(idx) / 5.0), fids, casts.hash[idx]))
         
         return echo_signals
         
-    def _detect_cascades(self, casts: List[FarcasterCast]) -> List[Dict]:
-        """Detect viral cascade patterns"""
-        # Look for rapid engagement growth patterns
-        cascade_signals = []
+    def _detect_cascades(self, casts: CastBatch) -> List[Tuple[float, np.ndarray, np.ndarray]]:
+        """Detect viral cascade patterns as (strength, fids, hashes)"""
+        # Look for rapid engagement growth patterns: high engagement (> 50)
+        # at a high rate (> 10 per minute since posting), in one vectorized pass
+        engagement = casts.likes + casts.recasts + casts.replies
+        now_ns = np.int64(time.time_ns())
+        minutes_since = (now_ns - casts.ts_ns) * (1.0 / 60e9)
         
-        # Sort by timestamp
-        sorted_casts = sorted(casts, key=lambda x: x.timestamp)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            engagement_rate = engagement / minutes_since
+        mask = (engagement > 50) & (minutes_since > 0) & (engagement_rate > 10)
         
-        # Find casts with rapid engagement acceleration
-        for i, cast in enumerate(sorted_casts):
-            total_engagement = cast.likes + cast.recasts + cast.replies
-            
-            # Look for suspicious engagement spikes
-            if total_engagement > 50:  # High engagement threshold
-                # Calculate engagement rate (engagement per minute since posting)
-                now = datetime.now()
-                minutes_since = (now - cast.timestamp).total_seconds() / 60
-                if minutes_since > 0:
-                    engagement_rate = total_engagement / minutes_since
-                    
-                    if engagement_rate > 10:  # High rate threshold
-                        cascade_signals.append({
-                            'strength': min(1.0, engagement_rate / 50.0),
-                            'fids': [cast.fid],
-                            'hashes': [cast.hash],
-                            'engagement_rate': engagement_rate
-                        })
-        
-        return cascade_signals
+        fids = casts.fid[mask]
+        hashes = casts.hash[mask]
+        return [
+            (min(1.0, rate / 50.0), fids[k:k + 1], hashes[k:k + 1])
+            for k, rate in enumerate(engagement_rate[mask].tolist())
+        ]
 
 class CoordinationMonitor:
     """Main coordination monitoring system"""
     
-    def __init__(self, mcp_path: str = "./farcaster-mcp"):
+    def __init__(self, mcp_path: str = "./farcaster-mcp", dashboard_url: Optional[str] = None):
         self.bridge = FarcasterMCPBridge(mcp_path)
         self.detector = CoordinationDetector()
         self.is_monitoring = False
         
+        # Optional dashboard sink: alerts from all channels are queued and
+        # POSTed in batches
+        self.dashboard_url = dashboard_url
+        self._alert_queue: Optional[asyncio.Queue] = None
+        self._alert_task: Optional[asyncio.Task] = None
+        self._dashboard_session: Optional[aiohttp.ClientSession] = None
+        
     @trace_agent("coordination_monitor")
     async def start_monitoring(self, channels: List[str] = None):
         """Start real-time coordination monitoring"""
         if channels is None:
             channels = ["base", "aichannel", "builders"]  # Default channels
             
-        logger.info(f"Starting coordination monitoring for channels: {channels}")
+        logger.info("Starting coordination monitoring for channels: %s", channels)
         
         # Start MCP server
         if not await self.bridge.start_mcp_server():
@@ -342,57 +840,128 @@ class CoordinationMonitor:
             
         self.is_monitoring = True
         
+        if self.dashboard_url:
+            self._alert_queue = asyncio.Queue()
+            self._dashboard_session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
+            self._alert_task = asyncio.create_task(self._dispatch_alerts())
+        
         try:
+            loop = asyncio.get_running_loop()
+            next_tick = loop.time()
             while self.is_monitoring:
-                # Monitor each channel
-                for channel in channels:
-                    logger.info(f"Monitoring channel: {channel}")
+                next_tick += 60  # Monitor every minute
+                
+                # Fetch every channel in one pipelined MCP batch, then analyze
+                batches = await self.bridge.get_channels_casts(channels, limit=100)
+                results = await asyncio.gather(
+                    *(self._analyze_channel(channel, batches[channel]) for channel in channels),
+                    return_exceptions=True
+                )
+                
+                for channel, result in zip(channels, results):
+                    if isinstance(result, Exception):
+                        logger.error("Error monitoring %s: %s", channel, result)
+                        continue
+                    
+                    _, signals = result
                     
-                    # Get recent casts
-                    casts = await self.bridge.get_channel_casts(channel, limit=100)
+                    # Check for pathological patterns
+                    pathological_signals = [s for s in signals if s.is_pathological()]
                     
-                    if casts:
-                        # Analyze for coordination patterns  
-                        signals = await self.detector.analyze_casts(casts)
-                        
-                        # Check for pathological patterns
-                        pathological_signals = [s for s in signals if s.is_pathological()]
-                        
-                        if pathological_signals:
-                            await self._alert_pathology(channel, pathological_signals)
-                        
-                        # Log normal signals for monitoring
+                    if pathological_signals:
+                        await self._alert_pathology(channel, pathological_signals)
+                    
+                    # Log normal signals for monitoring
+                    if logger.isEnabledFor(logging.INFO):
                         for signal in signals:
-                            logger.info(f"Signal detected: {signal.signal_type} "
-                                      f"strength={signal.strength:.2f} "
-                                      f"variance={signal.variance:.2f} "
-                                      f"autocorr={signal.autocorr:.2f}")
+                            logger.info("Signal detected: %s strength=%.2f variance=%.2f autocorr=%.2f",
+                                        signal.signal_type, signal.strength,
+                                        signal.variance, signal.autocorr)
                 
-                # Wait before next monitoring cycle
-                await asyncio.sleep(60)  # Monitor every minute
+                # Sleep until the next tick so polling time doesn't drift the cadence
+                await asyncio.sleep(max(0, next_tick - loop.time()))
                 
         except KeyboardInterrupt:
             logger.info("Monitoring stopped by user")
         except Exception as e:
-            logger.error(f"Monitoring error: {e}")
+            logger.error("Monitoring error: %s", e)
         finally:
             await self.stop_monitoring()
     
+    async def _analyze_channel(self, channel: str, casts: CastBatch) -> Tuple[str, List[SignalRecord]]:
+        """Analyze one channel's recent casts"""
+        logger.info("Monitoring channel: %s", channel)
+        
+        if not casts:
+            return channel, []
+        
+        # Analyze for coordination patterns
+        signals = await self.detector.analyze_casts(casts, channel=channel)
+        return channel, signals
+    
     async def stop_monitoring(self):
         """Stop coordination monitoring"""
         self.is_monitoring = False
         await self.bridge.stop_mcp_server()
+        await self._stop_alert_dispatch()
         logger.info("Coordination monitoring stopped")
         
-    async def _alert_pathology(self, channel: str, signals: List[CoordinationSignal]):
+    async def _alert_pathology(self, channel: str, records: List[SignalRecord]):
         """Alert when pathological coordination is detected"""
-        logger.warning(f"PATHOLOGICAL COORDINATION DETECTED in {channel}:")
-        for signal in signals:
-            logger.warning(f"  {signal.signal_type}: strength={signal.strength:.2f}, "
-                          f"variance={signal.variance:.2f}, autocorr={signal.autocorr:.2f}")
+        # Detector output only becomes full CoordinationSignals at the alert boundary
+        signals = [record.to_signal() for record in records]
+        
+        # One multi-line record instead of one logger call per signal
+        logger.warning(
+            "PATHOLOGICAL COORDINATION DETECTED in %s (%d signals):\n%s",
+            channel, len(signals),
+            "\n".join(
+                f"  {signal.signal_type}: strength={signal.strength:.2f}, "
+                f"variance={signal.variance:.2f}, autocorr={signal.autocorr:.2f}"
+                for signal in signals
+            )
+        )
+        
+        if self._alert_queue is not None:
+            self._alert_queue.put_nowait({
+                'channel': channel,
+                'signals': [signal.to_dict() for signal in signals]
+            })
+    
+    async def _dispatch_alerts(self):
+        """POST queued alerts to the dashboard, batching whatever has accumulated"""
+        while True:
+            batch = [await self._alert_queue.get()]
+            while not self._alert_queue.empty() and len(batch) < 100:
+                batch.append(self._alert_queue.get_nowait())
+            await self._post_alerts(batch)
+    
+    async def _post_alerts(self, batch: List[Dict[str, Any]]):
+        try:
+            async with self._dashboard_session.post(self.dashboard_url, json={'alerts': batch}) as response:
+                if response.status >= 400:
+                    logger.error("Dashboard rejected %d alerts: HTTP %d", len(batch), response.status)
+        except Exception as e:
+            logger.error("Error posting %d alerts to dashboard: %s", len(batch), e)
+    
+    async def _stop_alert_dispatch(self):
+        """Stop the dashboard dispatcher, posting any alerts still queued"""
+        if self._alert_task is None:
+            return
+        self._alert_task.cancel()
+        try:
+            await self._alert_task
+        except asyncio.CancelledError:
+            pass
+        self._alert_task = None
         
-        # In production, this would send alerts to monitoring dashboard
-        # or trigger intervention mechanisms
+        batch = []
+        while not self._alert_queue.empty():
+            batch.append(self._alert_queue.get_nowait())
+        if batch:
+            await self._post_alerts(batch)
+        await self._dashboard_session.close()
+        self._dashboard_session = None
 
 # Example usage and testing
 async def main():
@@ -403,7 +972,7 @@ async def main():
         # Start monitoring key Farcaster channels
         await monitor.start_monitoring(["base", "aichannel", "builders"])
     except Exception as e:
-        logger.error(f"Main error: {e}")
+        logger.error("Main error: %s", e)
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -4,16 +4,55 @@ Real-time detection of coordination failures using critical slowing down theory.
 """
 
 import asyncio
+import heapq
+import itertools
+import time
 import numpy as np
-from typing import Dict, List, Optional, Tuple
+from collections import deque
+from typing import Dict, List, Optional, Tuple, Union
 from dataclasses import dataclass
-from datetime import datetime, timedelta
+from datetime import datetime
 import logging
 
 # RagaAI-Catalyst integration for monitoring
-from raga_catalyst.trace import trace_agent, trace_tool
+from raga_catalyst.trace import trace_agent
 from raga_catalyst.traceable import traceable
 
+# Numba for the bulk window-sum kernel (NumPy reductions without it)
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _window_sums(ts, rt):
+        """Running-sum state of a run of points in one pass:
+        (gap sum, gap sum of squares, x sum, x sum of squares, sum x[i] * x[i+1])
+        """
+        gap_s1 = 0.0
+        gap_s2 = 0.0
+        s1 = 0.0
+        s2 = 0.0
+        sxx1 = 0.0
+        for i in range(rt.shape[0]):
+            x = rt[i]
+            s1 += x
+            s2 += x * x
+            if i > 0:
+                gap = ts[i] - ts[i - 1]
+                gap_s1 += gap
+                gap_s2 += gap * gap
+                sxx1 += rt[i - 1] * x
+        return gap_s1, gap_s2, s1, s2, sxx1
+else:
+    def _window_sums(ts, rt):
+        """Running-sum state of a run of points (see the Numba version)"""
+        gaps = np.diff(ts)
+        return (float(gaps.sum()), float(gaps @ gaps), float(rt.sum()),
+                float(rt @ rt), float(rt[:-1] @ rt[1:]))
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -45,17 +84,35 @@ class CoordinationMonitor:
     def __init__(self, window_size: int = 100, warning_threshold: float = 0.7):
         self.window_size = window_size
         self.warning_threshold = warning_threshold
-        self.interaction_history = []
-        self.metrics_history = []
-        self.warnings = []
+        self.interaction_history = deque(maxlen=window_size)
+        self._agent_ids = deque(maxlen=window_size)  # Agent of each interaction in the window
+        self.metrics_history = deque(maxlen=10_000)
+        self.warnings = deque(maxlen=10_000)
+        self._warning_times_ns = deque(maxlen=10_000)  # Epoch ns of each entry in warnings
+        
+        # Expiry times (epoch seconds) of warnings still inside the 10-minute
+        # status window, as a min-heap; its size is the recent-warning count
+        self._recent_warning_expiries: List[float] = []
+        
+        # Windowed timestamp/response-time series with running sums, so the
+        # CSD indicators are O(1) scalar math per tick instead of array rebuilds
+        self._timestamps = deque(maxlen=window_size)
+        self._resp = deque(maxlen=window_size)
+        self._gap_s1 = 0.0   # sum of inter-arrival gaps
+        self._gap_s2 = 0.0   # sum of squared gaps
+        self._resp_s1 = 0.0  # sum x
+        self._resp_s2 = 0.0  # sum x^2
+        self._resp_sxx1 = 0.0  # sum x[i] * x[i+1]
+        self._updates = 0
         
     @trace_agent('coordination_monitor')
-    async def analyze_coordination_patterns(self, interactions: List[Dict]) -> CoordinationMetrics:
+    async def analyze_coordination_patterns(self, interactions: Union[List[Dict], np.ndarray]) -> CoordinationMetrics:
         """
         Analyze coordination patterns from Farcaster interaction data.
         
         Args:
-            interactions: List of agent interaction events from Farcaster MCP
+            interactions: List of agent interaction events from Farcaster MCP, or
+                a structured array of them (farcaster_data_collector.INTERACTION_DTYPE)
             
         Returns:
             CoordinationMetrics with health assessment
@@ -71,16 +128,27 @@ class CoordinationMonitor:
                 coordination_health=1.0
             )
             
-        # Store interaction history
+        # Store interaction history (bounded to the analysis window)
         self.interaction_history.extend(interactions)
-        if len(self.interaction_history) > self.window_size:
-            self.interaction_history = self.interaction_history[-self.window_size:]
+        if isinstance(interactions, np.ndarray):
+            self._extend_window(interactions['ts'], interactions['rt'])
+            self._agent_ids.extend(interactions['agent_id'][-self.window_size:].tolist())
+        else:
+            for interaction in interactions:
+                self._push(interaction.get('timestamp', 0), interaction.get('response_time', 0))
+            self._agent_ids.extend(i.get('agent_id') for i in interactions)
+        agent_count = len(set(self._agent_ids))  # Distinct agents across the window
             
         # Calculate core CSD metrics
         variance = self._calculate_variance()
         autocorr = self._calculate_autocorrelation()
         response_time = self._calculate_response_time()
         
+        # One aggregate record per tick; the helpers above are too cheap to trace
+        # individually, and the values are captured by the outer trace
+        logger.debug("CSD indicators: variance=%.3f autocorr=%.3f response_time=%.1f",
+                     variance, autocorr, response_time)
+        
         # Calculate coordination health (inverse of warning signals)
         health = self._calculate_coordination_health(variance, autocorr, response_time)
         
@@ -90,55 +158,152 @@ class CoordinationMonitor:
             autocorrelation=autocorr,
             response_time=response_time,
             interaction_count=len(interactions),
-            agent_count=len(set(i.get('agent_id') for i in interactions)),
+            agent_count=agent_count,
             coordination_health=health
         )
         
         self.metrics_history.append(metrics)
         return metrics
         
-    @trace_tool('variance_calculator')
+    def _push(self, timestamp: float, response_time: float):
+        """Append one interaction to the windowed series, updating the running sums"""
+        timestamps, resp = self._timestamps, self._resp
+        if len(resp) == resp.maxlen:
+            # Evict the oldest point and the gap/pair it starts
+            oldest = resp.popleft()
+            oldest_ts = timestamps.popleft()
+            self._resp_s1 -= oldest
+            self._resp_s2 -= oldest * oldest
+            if resp:
+                self._resp_sxx1 -= oldest * resp[0]
+                gap = timestamps[0] - oldest_ts
+                self._gap_s1 -= gap
+                self._gap_s2 -= gap * gap
+        
+        x = float(response_time)
+        if resp:
+            self._resp_sxx1 += resp[-1] * x
+            gap = float(timestamp) - timestamps[-1]
+            self._gap_s1 += gap
+            self._gap_s2 += gap * gap
+        timestamps.append(float(timestamp))
+        resp.append(x)
+        self._resp_s1 += x
+        self._resp_s2 += x * x
+        
+        # Re-sum periodically so float error from evictions can't accumulate
+        self._updates += 1
+        if self._updates >= 100 * self.window_size:
+            self._resync()
+    
+    def _extend_window(self, timestamps: np.ndarray, response_times: np.ndarray):
+        """Append a batch of points to the windowed series, updating the running
+        sums with one kernel pass over the batch and one over the evicted points"""
+        ts = np.ascontiguousarray(timestamps, dtype=np.float64)
+        rt = np.ascontiguousarray(response_times, dtype=np.float64)
+        n = rt.shape[0]
+        if n >= self.window_size:
+            # The batch alone fills the window
+            self._load_window(ts[-self.window_size:], rt[-self.window_size:])
+            return
+        
+        old_ts, old_rt = self._timestamps, self._resp
+        expired = len(old_rt) + n - self.window_size
+        if expired > 0:
+            # Evicted points plus the first survivor, so the gaps/pairs they start are covered
+            head_ts = np.fromiter(itertools.islice(old_ts, expired + 1), np.float64, expired + 1)
+            head_rt = np.fromiter(itertools.islice(old_rt, expired + 1), np.float64, expired + 1)
+            gap_s1, gap_s2, s1, s2, sxx1 = _window_sums(head_ts, head_rt)
+            survivor = float(head_rt[-1])
+            self._gap_s1 -= gap_s1
+            self._gap_s2 -= gap_s2
+            self._resp_s1 -= s1 - survivor
+            self._resp_s2 -= s2 - survivor * survivor
+            self._resp_sxx1 -= sxx1
+        
+        gap_s1, gap_s2, s1, s2, sxx1 = _window_sums(ts, rt)
+        if old_rt:
+            # The gap/pair joining the window's last point to the batch
+            gap = float(ts[0]) - old_ts[-1]
+            gap_s1 += gap
+            gap_s2 += gap * gap
+            sxx1 += old_rt[-1] * float(rt[0])
+        self._gap_s1 += gap_s1
+        self._gap_s2 += gap_s2
+        self._resp_s1 += s1
+        self._resp_s2 += s2
+        self._resp_sxx1 += sxx1
+        old_ts.extend(ts.tolist())
+        old_rt.extend(rt.tolist())
+        
+        # Re-sum periodically so float error from evictions can't accumulate
+        self._updates += n
+        if self._updates >= 100 * self.window_size:
+            self._resync()
+    
+    def _load_window(self, timestamps: np.ndarray, response_times: np.ndarray):
+        """Replace the windowed series with a full window of points and its sums"""
+        ts = np.ascontiguousarray(timestamps, dtype=np.float64)
+        rt = np.ascontiguousarray(response_times, dtype=np.float64)
+        self._timestamps.clear()
+        self._timestamps.extend(ts.tolist())
+        self._resp.clear()
+        self._resp.extend(rt.tolist())
+        (self._gap_s1, self._gap_s2, self._resp_s1,
+         self._resp_s2, self._resp_sxx1) = _window_sums(ts, rt)
+        self._updates = 0
+        
+    def _resync(self):
+        ts = list(self._timestamps)
+        resp = list(self._resp)
+        gaps = [b - a for a, b in zip(ts, ts[1:])]
+        self._gap_s1 = sum(gaps)
+        self._gap_s2 = sum(g * g for g in gaps)
+        self._resp_s1 = sum(resp)
+        self._resp_s2 = sum(x * x for x in resp)
+        self._resp_sxx1 = sum(a * b for a, b in zip(resp, resp[1:]))
+        self._updates = 0
+    
     def _calculate_variance(self) -> float:
         """Calculate variance in interaction timing (CSD indicator)"""
-        if len(self.interaction_history) < 2:
+        n = len(self._timestamps) - 1  # Number of intervals
+        if n < 1:
             return 0.0
-            
-        timestamps = [i.get('timestamp', 0) for i in self.interaction_history]
-        intervals = np.diff(timestamps)
-        return float(np.var(intervals)) if len(intervals) > 0 else 0.0
         
-    @trace_tool('autocorrelation_calculator') 
+        mean = self._gap_s1 / n
+        return max(self._gap_s2 / n - mean * mean, 0.0)
+        
     def _calculate_autocorrelation(self, lag: int = 1) -> float:
         """Calculate lag-1 autocorrelation in interaction patterns (CSD indicator)"""
-        if len(self.interaction_history) < lag + 2:
-            return 0.0
-            
         # Use response times as the time series
-        response_times = [i.get('response_time', 0) for i in self.interaction_history]
-        
-        if len(response_times) < lag + 1:
+        n = len(self._resp)
+        if n < lag + 2:
             return 0.0
-            
-        series = np.array(response_times)
-        n = len(series)
         
-        # Calculate autocorrelation at specified lag
-        mean = np.mean(series)
-        c0 = np.mean((series - mean) ** 2)
-        
-        if c0 == 0:
+        mean = self._resp_s1 / n
+        c0 = self._resp_s2 / n - mean * mean
+        if c0 <= 1e-12 * max(self._resp_s2 / n, 1.0):
             return 0.0
-            
-        c_lag = np.mean((series[:-lag] - mean) * (series[lag:] - mean))
-        return float(c_lag / c0)
+        
+        if lag == 1:
+            # sum((x[i] - mean) * (x[i+1] - mean)) expanded over the running sums
+            head = self._resp_s1 - self._resp[-1]
+            tail = self._resp_s1 - self._resp[0]
+            c_lag = (self._resp_sxx1 - mean * (head + tail) + (n - 1) * mean * mean) / (n - 1)
+        elif n > 1024:
+            series = np.fromiter(self._resp, dtype=np.float64, count=n) - mean
+            c_lag = float(np.mean(series[:-lag] * series[lag:]))
+        else:
+            series = [x - mean for x in self._resp]
+            c_lag = sum(a * b for a, b in zip(series, series[lag:])) / (n - lag)
+        return c_lag / c0
         
     def _calculate_response_time(self) -> float:
         """Calculate average response time between interactions"""
-        if len(self.interaction_history) < 2:
+        if len(self._resp) < 2:
             return 0.0
             
-        response_times = [i.get('response_time', 0) for i in self.interaction_history]
-        return float(np.mean(response_times))
+        return self._resp_s1 / len(self._resp)
         
     def _calculate_coordination_health(self, variance: float, autocorr: float, response_time: float) -> float:
         """
@@ -185,19 +350,44 @@ class CoordinationMonitor:
                 threshold_exceeded=severity > self.warning_threshold
             )
             
+            warned_at = warning.timestamp.timestamp()
             self.warnings.append(warning)
+            self._warning_times_ns.append(int(warned_at * 1e9))
+            heapq.heappush(self._recent_warning_expiries, warned_at + 600)
+            self._prune_recent_warnings()
             return warning
             
         return None
         
+    def warnings_since(self, cutoff_ns: int) -> List[EarlyWarningSignal]:
+        """Warnings timestamped after cutoff_ns (epoch ns), oldest first.
+        
+        Scans back from the newest, so the cost is proportional to the result.
+        """
+        count = 0
+        for warned_at in reversed(self._warning_times_ns):
+            if warned_at <= cutoff_ns:
+                break
+            count += 1
+        recent = list(itertools.islice(reversed(self.warnings), count))
+        recent.reverse()
+        return recent
+        
+    def _prune_recent_warnings(self) -> int:
+        """Drop expired entries from the recent-warning heap and return its size"""
+        expiries = self._recent_warning_expiries
+        now = time.time()
+        while expiries and expiries[0] <= now:
+            heapq.heappop(expiries)
+        return len(expiries)
+        
     def get_coordination_status(self) -> Dict:
         """Get current coordination system status"""
         if not self.metrics_history:
             return {"status": "no_data", "health": 1.0}
             
         latest = self.metrics_history[-1]
-        recent_warnings = [w for w in self.warnings 
-                          if w.timestamp > datetime.now() - timedelta(minutes=10)]
+        recent_warnings = self._prune_recent_warnings()
         
         status = "healthy"
         if latest.coordination_health < 0.3:
@@ -213,7 +403,7 @@ class CoordinationMonitor:
             "variance": latest.variance,
             "autocorrelation": latest.autocorrelation,
             "response_time": latest.response_time,
-            "recent_warnings": len(recent_warnings),
+            "recent_warnings": recent_warnings,
             "agent_count": latest.agent_count,
             "interaction_count": latest.interaction_count
         }
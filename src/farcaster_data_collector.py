@@ -6,24 +6,116 @@ Collects real-time agent interaction data from Farcaster via MCP servers.
 import asyncio
 import json
 import logging
-from typing import Dict, List, Optional, AsyncGenerator
-from datetime import datetime
-import aiohttp
-from dataclasses import dataclass
+import sys
+import time
+from collections import deque
+from typing import Dict, List, Optional, AsyncGenerator, Tuple
+import httpx
+import numpy as np
+from dataclasses import dataclass, asdict
+
+from sse_utils import iter_sse_messages
+
+# msgspec Structs for interaction records (optional; slotted dataclass without it)
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+
+# h2 enables HTTP/2 in httpx, multiplexing SSE streams over one connection (optional)
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# orjson for encoding interaction batches (optional)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
-@dataclass
-class AgentInteraction:
-    """Represents a single agent interaction on Farcaster"""
-    agent_id: str
-    interaction_type: str  # 'cast', 'like', 'recast', 'reply'
-    timestamp: int
-    target_agent: Optional[str]
-    response_time: float  # milliseconds
-    content_length: int
-    channel: Optional[str]
-    engagement_score: float
+if MSGSPEC_AVAILABLE:
+    class AgentInteraction(msgspec.Struct):
+        """Represents a single agent interaction on Farcaster"""
+        agent_id: str
+        interaction_type: str  # 'cast', 'like', 'recast', 'reply'
+        timestamp: int
+        target_agent: Optional[str]
+        response_time: float  # milliseconds
+        content_length: int
+        channel: Optional[str]
+        engagement_score: float
+    
+    _interaction_encoder = msgspec.json.Encoder()
+    _interaction_decoder = msgspec.json.Decoder(AgentInteraction)
+else:
+    @dataclass(slots=True)
+    class AgentInteraction:
+        """Represents a single agent interaction on Farcaster"""
+        agent_id: str
+        interaction_type: str  # 'cast', 'like', 'recast', 'reply'
+        timestamp: int
+        target_agent: Optional[str]
+        response_time: float  # milliseconds
+        content_length: int
+        channel: Optional[str]
+        engagement_score: float
+
+_json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+def _decode_interaction(data: str) -> AgentInteraction:
+    """AgentInteraction from one SSE event's JSON payload"""
+    if MSGSPEC_AVAILABLE:
+        interaction = _interaction_decoder.decode(data)
+    else:
+        interaction = AgentInteraction(**_json_loads(data))
+    
+    # Low-cardinality strings: share one object per value across all records
+    interaction.agent_id = sys.intern(interaction.agent_id)
+    interaction.interaction_type = sys.intern(interaction.interaction_type)
+    if interaction.target_agent is not None:
+        interaction.target_agent = sys.intern(interaction.target_agent)
+    if interaction.channel is not None:
+        interaction.channel = sys.intern(interaction.channel)
+    return interaction
+
+# Categorical values sampled by the simulated collectors (interned, like agent ids)
+_INTERACTION_TYPES = tuple(sys.intern(t) for t in ('cast', 'like', 'recast', 'reply'))
+_CHANNELS = (None,) + tuple(sys.intern(c) for c in ('ai-agents', 'dev', 'based'))
+_INTERACTION_TYPE_CODES = {name: code for code, name in enumerate(_INTERACTION_TYPES)}
+_UNKNOWN_INTERACTION_TYPE = -1  # itype code for types outside _INTERACTION_TYPES (e.g. from SSE)
+
+# Column layout of interaction arrays. Agents are interned to integer codes
+# (FarcasterDataCollector.agent_names); target is -1 when there is none
+INTERACTION_DTYPE = np.dtype([
+    ('agent_id', '<i4'),
+    ('ts', '<i8'),       # epoch milliseconds
+    ('rt', '<f4'),       # response time, milliseconds
+    ('itype', '<i1'),    # index into _INTERACTION_TYPES, -1 if unknown
+    ('target', '<i4'),
+    ('eng', '<f4'),
+])
+
+# Request headers for SSE streams: no intermediary caching of the event stream
+_SSE_HEADERS = {'Accept': 'text/event-stream', 'Cache-Control': 'no-cache'}
+
+def create_client() -> httpx.AsyncClient:
+    """HTTP client with a keep-alive connection pool, meant to be shared process-wide.
+    
+    No read timeout, since SSE streams stay open indefinitely. Responses may be
+    gzip/deflate compressed; httpx decodes them transparently.
+    """
+    return httpx.AsyncClient(
+        headers={'Accept-Encoding': 'gzip, deflate'},
+        timeout=httpx.Timeout(None, connect=10.0),
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=75),
+        http2=HTTP2_AVAILABLE
+    )
 
 class FarcasterDataCollector:
     """
@@ -31,19 +123,45 @@ class FarcasterDataCollector:
     Focuses on agent-to-agent coordination patterns.
     """
     
-    def __init__(self, mcp_server_url: str = "http://localhost:8080/sse"):
+    def __init__(self, mcp_server_url: str = "http://localhost:8080/sse", buffer_size: int = 1000,
+                 client: Optional[httpx.AsyncClient] = None, seed: Optional[int] = None):
         self.mcp_server_url = mcp_server_url
         self.known_agents = set()
-        self.interaction_buffer = []
-        self.session = None
+        self._agents_tuple: Tuple[str, ...] = ()  # Snapshot of known_agents for sampling
+        self._agents_ready = False  # identify_ai_agents has run
+        self.agent_names: List[str] = []  # Agent code -> agent id
+        self._agent_codes: Dict[str, int] = {}
+        # Most recent streamed interactions; the oldest drop off once full
+        self.interaction_buffer = deque(maxlen=buffer_size)
+        
+        # Published interactions waiting for stream_interactions; consumers
+        # sleep on the condition until a producer notifies
+        self._stream_queue = deque(maxlen=1024)
+        self._stream_cond = asyncio.Condition()
+        
+        # One generator for all simulated sampling. Streamed events draw from
+        # blocks of pre-sampled fields instead of calling the sampler per event
+        self._rng = np.random.default_rng(seed)
+        self._draw_block = 1024
+        self._draws: List[tuple] = []
+        self._draw_cursor = 0
+        
+        # A client passed in is shared and stays open; one created here is ours to close
+        self.client = client
+        self._owns_client = False
         
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession()
+        if self.client is None:
+            self.client = create_client()
+            self._owns_client = True
+        await self.identify_ai_agents()
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
-            await self.session.close()
+        if self.client and self._owns_client:
+            await self.client.aclose()
+            self.client = None
+            self._owns_client = False
             
     async def identify_ai_agents(self) -> List[str]:
         """
@@ -53,16 +171,24 @@ class FarcasterDataCollector:
         # For now, maintain a hardcoded list of known agents
         # In production, this would query a registry or use ML classification
         known_ai_agents = [
-            "agentic_mira",
-            "based-agent", 
-            "clanker",
-            "askgina.eth",
-            "bountybot",
-            # Add more as discovered
+            sys.intern(agent) for agent in (
+                "agentic_mira",
+                "based-agent", 
+                "clanker",
+                "askgina.eth",
+                "bountybot",
+                # Add more as discovered
+            )
         ]
         
-        self.known_agents.update(known_ai_agents)
-        return list(self.known_agents)
+        if not self.known_agents.issuperset(known_ai_agents):
+            self.known_agents.update(known_ai_agents)
+            # Fixed order (not set iteration order, which varies with PYTHONHASHSEED)
+            # so seeded sampling picks the same agents on every run
+            self._agents_tuple = tuple(known_ai_agents) + tuple(
+                sorted(self.known_agents.difference(known_ai_agents)))
+        self._agents_ready = True
+        return list(self._agents_tuple)
         
     async def collect_interactions(self, duration_minutes: int = 10) -> List[AgentInteraction]:
         """
@@ -74,7 +200,8 @@ class FarcasterDataCollector:
         Returns:
             List of agent interactions
         """
-        await self.identify_ai_agents()
+        if not self._agents_ready:
+            await self.identify_ai_agents()
         interactions = []
         
         try:
@@ -92,71 +219,130 @@ class FarcasterDataCollector:
         Simulate interaction collection for testing.
         In production, this would be replaced with real MCP server integration.
         """
-        import random
-        
-        interactions = []
-        agents = list(self.known_agents)
+        agents = self._agents_tuple
         
         if not agents:
-            return interactions
+            return []
             
-        # Simulate interactions over time
-        start_time = int(datetime.now().timestamp() * 1000)
+        # Simulate interactions over time, sampling every field for the
+        # whole window in one vectorized draw
+        n = duration_minutes * 5  # ~5 interactions per minute
+        rng = self._rng
+        start_time = time.time_ns() // 1_000_000  # Epoch milliseconds
         
-        for i in range(duration_minutes * 5):  # ~5 interactions per minute
-            timestamp = start_time + (i * 12000)  # 12 second intervals
-            
-            agent = random.choice(agents)
-            target = random.choice(agents) if random.random() > 0.3 else None
-            
-            interaction = AgentInteraction(
-                agent_id=agent,
-                interaction_type=random.choice(['cast', 'like', 'recast', 'reply']),
-                timestamp=timestamp,
-                target_agent=target,
-                response_time=random.gauss(1500, 500),  # 1.5s ± 0.5s
-                content_length=random.randint(50, 280),
-                channel=random.choice([None, 'ai-agents', 'dev', 'based']),
-                engagement_score=random.random()
+        timestamps = (start_time + np.arange(n, dtype=np.int64) * 12000).tolist()  # 12 second intervals
+        agent_idx = rng.integers(0, len(agents), n).tolist()
+        target_idx = rng.integers(0, len(agents), n).tolist()
+        has_target = (rng.random(n) > 0.3).tolist()
+        type_idx = rng.integers(0, len(_INTERACTION_TYPES), n).tolist()
+        response_times = rng.normal(1500, 500, n).tolist()  # 1.5s ± 0.5s
+        content_lengths = rng.integers(50, 281, n).tolist()
+        channel_idx = rng.integers(0, len(_CHANNELS), n).tolist()
+        engagement = rng.random(n).tolist()
+        
+        return [
+            AgentInteraction(
+                agent_id=agents[a],
+                interaction_type=_INTERACTION_TYPES[t],
+                timestamp=ts,
+                target_agent=agents[g] if h else None,
+                response_time=rt,
+                content_length=length,
+                channel=_CHANNELS[c],
+                engagement_score=e
             )
-            
-            interactions.append(interaction)
-            
-        return interactions
+            for ts, a, g, h, t, rt, length, c, e in zip(
+                timestamps, agent_idx, target_idx, has_target, type_idx,
+                response_times, content_lengths, channel_idx, engagement
+            )
+        ]
         
     async def stream_interactions(self) -> AsyncGenerator[AgentInteraction, None]:
         """
         Stream interactions in real-time.
         This would connect to the MCP server's SSE endpoint in production.
         """
-        await self.identify_ai_agents()
+        if not self._agents_ready:
+            await self.identify_ai_agents()
         
         # Simulate real-time streaming
+        producer = asyncio.create_task(self._simulate_arrivals())
+        try:
+            while True:
+                async with self._stream_cond:
+                    await self._stream_cond.wait_for(lambda: self._stream_queue)
+                    interaction = self._stream_queue.popleft()
+                self.interaction_buffer.append(interaction)
+                yield interaction
+        finally:
+            producer.cancel()
+            
+    async def publish(self, interaction: AgentInteraction):
+        """Hand an interaction to stream_interactions, waking a waiting consumer"""
+        async with self._stream_cond:
+            self._stream_queue.append(interaction)
+            self._stream_cond.notify()
+            
+    async def _simulate_arrivals(self):
+        """Simulated producer: a possible interaction every 2 seconds"""
         while True:
             interaction = await self._get_next_interaction()
             if interaction:
-                yield interaction
+                await self.publish(interaction)
             await asyncio.sleep(2)  # 2 second intervals
             
+    async def stream_sse_interactions(self) -> AsyncGenerator[AgentInteraction, None]:
+        """
+        Stream interactions from the MCP server's SSE endpoint.
+        Each event is decoded and yielded as soon as it completes.
+        """
+        async with self.client.stream("GET", self.mcp_server_url, headers=_SSE_HEADERS) as response:
+            response.raise_for_status()
+            async for message in iter_sse_messages(response.aiter_lines()):
+                interaction = _decode_interaction(message.data)
+                self.interaction_buffer.append(interaction)
+                yield interaction
+            
+    def _refill_draws(self):
+        """Pre-sample the fields of the next block of simulated stream events"""
+        n = self._draw_block
+        rng = self._rng
+        self._draws = list(zip(
+            (rng.random(n) > 0.3).tolist(),                      # interaction arrives (70%)
+            rng.random(n).tolist(),                              # agent pick
+            rng.integers(0, len(_INTERACTION_TYPES), n).tolist(),
+            (rng.random(n) > 0.4).tolist(),                      # has a target (60%)
+            rng.random(n).tolist(),                              # target pick
+            rng.normal(1500, 500, n).tolist(),                   # response time
+            rng.integers(50, 281, n).tolist(),                   # content length
+            rng.integers(0, len(_CHANNELS), n).tolist(),
+            rng.random(n).tolist()                               # engagement
+        ))
+        self._draw_cursor = 0
+        
     async def _get_next_interaction(self) -> Optional[AgentInteraction]:
         """Get the next interaction from the stream"""
-        import random
-        
-        agents = list(self.known_agents)
+        agents = self._agents_tuple
         if not agents:
             return None
             
+        if self._draw_cursor >= len(self._draws):
+            self._refill_draws()
+        arrives, agent_u, type_idx, has_target, target_u, rt, length, channel_idx, engagement = \
+            self._draws[self._draw_cursor]
+        self._draw_cursor += 1
+            
         # Simulate receiving an interaction
-        if random.random() > 0.3:  # 70% chance of interaction
+        if arrives:
             return AgentInteraction(
-                agent_id=random.choice(agents),
-                interaction_type=random.choice(['cast', 'like', 'recast', 'reply']),
-                timestamp=int(datetime.now().timestamp() * 1000),
-                target_agent=random.choice(agents) if random.random() > 0.4 else None,
-                response_time=random.gauss(1500, 500),
-                content_length=random.randint(50, 280),
-                channel=random.choice([None, 'ai-agents', 'dev', 'based']),
-                engagement_score=random.random()
+                agent_id=agents[int(agent_u * len(agents))],
+                interaction_type=_INTERACTION_TYPES[type_idx],
+                timestamp=time.time_ns() // 1_000_000,
+                target_agent=agents[int(target_u * len(agents))] if has_target else None,
+                response_time=rt,
+                content_length=length,
+                channel=_CHANNELS[channel_idx],
+                engagement_score=engagement
             )
             
         return None
@@ -175,6 +361,40 @@ class FarcasterDataCollector:
             for interaction in interactions
         ]
         
+    def _agent_code(self, agent_id: str) -> int:
+        """Integer code for an agent id, assigning the next one on first sight"""
+        code = self._agent_codes.get(agent_id)
+        if code is None:
+            code = self._agent_codes[agent_id] = len(self.agent_names)
+            self.agent_names.append(agent_id)
+        return code
+        
+    def convert_to_array(self, interactions: List[AgentInteraction]) -> np.ndarray:
+        """Convert AgentInteraction objects to a structured INTERACTION_DTYPE array"""
+        array = np.empty(len(interactions), dtype=INTERACTION_DTYPE)
+        agent_code = self._agent_code
+        array['agent_id'] = [agent_code(i.agent_id) for i in interactions]
+        array['ts'] = [i.timestamp for i in interactions]
+        array['rt'] = [i.response_time for i in interactions]
+        type_code = _INTERACTION_TYPE_CODES.get
+        array['itype'] = [type_code(i.interaction_type, _UNKNOWN_INTERACTION_TYPE)
+                          for i in interactions]
+        array['target'] = [-1 if i.target_agent is None else agent_code(i.target_agent)
+                           for i in interactions]
+        array['eng'] = [i.engagement_score for i in interactions]
+        return array
+        
+    def encode_interactions(self, interactions: List[AgentInteraction]) -> bytes:
+        """Encode interactions as a JSON array of records, for consumers that only need JSON
+        
+        msgspec and orjson encode the records natively, skipping the per-record dict.
+        """
+        if MSGSPEC_AVAILABLE:
+            return _interaction_encoder.encode(interactions)
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(interactions)
+        return json.dumps([asdict(interaction) for interaction in interactions]).encode()
+        
     async def get_coordination_data(self, window_minutes: int = 5) -> List[Dict]:
         """
         Get coordination data suitable for feeding to the CoordinationMonitor.
@@ -187,6 +407,11 @@ class FarcasterDataCollector:
         """
         interactions = await self.collect_interactions(window_minutes)
         return self.convert_to_monitor_format(interactions)
+        
+    async def get_coordination_array(self, window_minutes: int = 5) -> np.ndarray:
+        """Like get_coordination_data, as a structured array the monitor analyzes column-wise"""
+        interactions = await self.collect_interactions(window_minutes)
+        return self.convert_to_array(interactions)
 
 # Real MCP server integration (for when we have access)
 class RealFarcasterMCP:
@@ -195,22 +420,38 @@ class RealFarcasterMCP:
     This requires kaiblade/farcaster-mcp running locally.
     """
     
-    def __init__(self, mcp_server_url: str = "http://localhost:8080"):
+    def __init__(self, mcp_server_url: str = "http://localhost:8080",
+                 client: Optional[httpx.AsyncClient] = None):
         self.mcp_server_url = mcp_server_url
+        # Reused for every call and stream (see FarcasterDataCollector)
+        self.client = client
+        self._owns_client = False
+        
+    async def __aenter__(self):
+        if self.client is None:
+            self.client = create_client()
+            self._owns_client = True
+        return self
+        
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self.client and self._owns_client:
+            await self.client.aclose()
+            self.client = None
+            self._owns_client = False
         
     async def get_recent_casts(self, limit: int = 50) -> List[Dict]:
         """Get recent casts from Farcaster MCP server"""
-        # This would make actual MCP calls
-        # await mcp_call("get_recent_casts", {"limit": limit})
+        # This would make actual MCP calls over self.client
+        # await mcp_call(self.client, "get_recent_casts", {"limit": limit})
         pass
         
     async def monitor_channel(self, channel: str) -> AsyncGenerator[Dict, None]:
         """Monitor a specific channel for agent activity"""
-        # This would set up SSE stream from MCP server
-        # async with mcp_stream("channel_activity", {"channel": channel}) as stream:
-        #     async for event in stream:
-        #         yield event
-        pass
+        async with self.client.stream("GET", f"{self.mcp_server_url}/sse",
+                                      params={"channel": channel}, headers=_SSE_HEADERS) as response:
+            response.raise_for_status()
+            async for message in iter_sse_messages(response.aiter_lines()):
+                yield _json_loads(message.data)
 
 # Example usage
 if __name__ == "__main__":
@@ -4,12 +4,58 @@ Real-time early warning system for AI agent coordination failures.
 """
 
 import asyncio
+import heapq
+import json
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List
+import time
+from dataclasses import asdict, is_dataclass
+from datetime import datetime
+from typing import Any, Dict, List
+
+import numpy as np
 
 from coordination_monitor import CoordinationMonitor, EarlyWarningSignal
-from farcaster_data_collector import FarcasterDataCollector
+from farcaster_data_collector import FarcasterDataCollector, create_client
+
+# orjson for structured log records (optional)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def _json_default(obj: Any) -> Any:
+    if is_dataclass(obj):
+        return asdict(obj)
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+def _json_record(record: Dict) -> str:
+    """One-line JSON log record; dataclasses and datetimes are serialized natively"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(record, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+    return json.dumps(record, default=_json_default)
+
+# uvloop as the event loop (optional; stock asyncio loop without it)
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+def run(main):
+    """asyncio.run on a uvloop event loop when available"""
+    if not hasattr(asyncio, "Runner"):
+        # Python < 3.11: install uvloop's policy so asyncio.run builds a uvloop loop
+        if UVLOOP_AVAILABLE:
+            uvloop.install()
+        return asyncio.run(main)
+    loop_factory = uvloop.new_event_loop if UVLOOP_AVAILABLE else None
+    with asyncio.Runner(loop_factory=loop_factory) as runner:
+        return runner.run(main)
 
 # Configure logging
 logging.basicConfig(
@@ -30,29 +76,39 @@ class CoordinationMonitoringSystem:
             warning_threshold=0.7
         )
         self.data_collector = None
+        self.http_client = None  # One HTTP connection pool shared by all collectors
         self.is_running = False
         self.warning_callbacks = []
         
+        # Streamed interactions awaiting analysis; the producer blocks while
+        # it is full. Analysis runs on micro-batches of min_batch_size to
+        # batch_size, or on whatever is pending (2+) once batch_interval passes
+        self.queue_size = 500
+        self.batch_size = 64
+        self.min_batch_size = 16
+        self.batch_interval = 2.0  # seconds
+        self.work_queue = None
+        self._pending = []  # Drained interactions not yet analyzed
+        self._pending_deadline = 0.0  # Loop time by which _pending is analyzed
+        
     async def start(self):
         """Start the monitoring system"""
         logger.info("Starting Farcaster Coordination Monitor...")
         
-        self.data_collector = FarcasterDataCollector()
+        self.http_client = create_client()
+        self.data_collector = FarcasterDataCollector(client=self.http_client)
         await self.data_collector.__aenter__()
         
         self.is_running = True
-        
-        # Start monitoring tasks
-        tasks = [
-            asyncio.create_task(self._monitoring_loop()),
-            asyncio.create_task(self._status_reporter())
-        ]
+        self.work_queue = asyncio.Queue(maxsize=self.queue_size)
+        producer = asyncio.create_task(self._ingest())
         
         try:
-            await asyncio.gather(*tasks)
+            await self._run_schedule()
         except KeyboardInterrupt:
             logger.info("Monitoring interrupted by user")
         finally:
+            producer.cancel()
             await self.stop()
             
     async def stop(self):
@@ -63,69 +119,115 @@ class CoordinationMonitoringSystem:
         if self.data_collector:
             await self.data_collector.__aexit__(None, None, None)
             
-    async def _monitoring_loop(self):
-        """Main monitoring loop - collects data and analyzes coordination"""
+        if self.http_client:
+            await self.http_client.aclose()
+            self.http_client = None
+            
+    async def _ingest(self):
+        """Producer: stream interactions into the work queue (backpressured when full)"""
+        try:
+            async for interaction in self.data_collector.stream_interactions():
+                await self.work_queue.put(interaction)
+        except Exception as e:
+            logger.error(f"Error in interaction stream: {e}")
+            
+    async def _run_schedule(self):
+        """Analyze queued interactions as they arrive, and run the periodic
+        jobs on this same task, earliest deadline first"""
         logger.info("Starting monitoring loop...")
+        loop = asyncio.get_running_loop()
+        
+        # (due time, tie-break, interval seconds, job); runs at startup
+        jobs = [
+            (loop.time(), 0, 300, self._report_status)      # Status report every 5 minutes
+        ]
+        heapq.heapify(jobs)
         
         while self.is_running:
-            try:
-                # Collect interaction data from the last 5 minutes
-                coordination_data = await self.data_collector.get_coordination_data(
-                    window_minutes=5
-                )
+            due, order, interval, job = jobs[0]
+            delay = due - loop.time()
+            if delay > 0:
+                # Consume work until the next job is due
+                await self._consume(delay)
+                continue  # Re-check is_running before running the job
                 
-                if coordination_data:
-                    # Analyze coordination patterns
-                    metrics = await self.monitor.analyze_coordination_patterns(
-                        coordination_data
-                    )
-                    
-                    logger.info(f"Health: {metrics.coordination_health:.2f}, "
-                              f"Variance: {metrics.variance:.1f}, "
-                              f"Autocorr: {metrics.autocorrelation:.3f}")
-                    
-                    # Check for early warning signals
-                    warning = self.monitor.detect_early_warnings(metrics)
-                    if warning:
-                        await self._handle_warning(warning)
-                        
-                else:
-                    logger.debug("No coordination data collected this cycle")
+            await job()
+            # Next run is one interval after this one finished
+            heapq.heapreplace(jobs, (loop.time() + interval, order, interval, job))
+            
+    async def _consume(self, timeout: float):
+        """Wait up to timeout for work, then analyze one micro-batch of what is queued"""
+        loop = asyncio.get_running_loop()
+        batch = self._pending
+        if batch:
+            # Don't hold a partial batch past its deadline
+            timeout = min(timeout, self._pending_deadline - loop.time())
+        try:
+            if timeout > 0:
+                first = await asyncio.wait_for(self.work_queue.get(), timeout)
+            else:
+                first = self.work_queue.get_nowait()
+        except (asyncio.TimeoutError, asyncio.QueueEmpty):
+            first = None
+            
+        if first is not None:
+            if not batch:
+                self._pending_deadline = loop.time() + self.batch_interval
+            batch.append(first)
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.work_queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
                     
-            except Exception as e:
-                logger.error(f"Error in monitoring loop: {e}")
-                
-            # Wait before next monitoring cycle (30 seconds)
-            await asyncio.sleep(30)
+        if len(batch) >= self.min_batch_size or (
+                len(batch) >= 2 and loop.time() >= self._pending_deadline):
+            self._pending = []
+            await self._analyze_batch(batch)
             
-    async def _status_reporter(self):
-        """Periodically report system status"""
-        while self.is_running:
-            try:
-                status = self.monitor.get_coordination_status()
+    async def _analyze_batch(self, interactions: List):
+        """Analyze coordination over a micro-batch of streamed interactions"""
+        try:
+            coordination_data = self.data_collector.convert_to_array(interactions)
+            
+            # Analyze coordination patterns
+            metrics = await self.monitor.analyze_coordination_patterns(
+                coordination_data
+            )
+            
+            logger.debug(f"Health: {metrics.coordination_health:.2f}, "
+                         f"Variance: {metrics.variance:.1f}, "
+                         f"Autocorr: {metrics.autocorrelation:.3f}")
+            
+            # Check for early warning signals
+            warning = self.monitor.detect_early_warnings(metrics)
+            if warning:
+                await self._handle_warning(warning)
                 
-                if status["status"] != "healthy":
-                    logger.warning(f"Coordination Status: {status}")
-                else:
-                    logger.info(f"System healthy - Health: {status['health']:.2f}")
-                    
-            except Exception as e:
-                logger.error(f"Error in status reporter: {e}")
+        except Exception as e:
+            logger.error(f"Error in monitoring loop: {e}")
+            
+    async def _report_status(self):
+        """Report system status"""
+        try:
+            status = self.monitor.get_coordination_status()
+            level = logging.WARNING if status["status"] != "healthy" else logging.INFO
+            if logger.isEnabledFor(level):
+                logger.log(level, _json_record({"evt": "coord_status", **status}))
                 
-            # Report every 5 minutes
-            await asyncio.sleep(300)
+        except Exception as e:
+            logger.error(f"Error in status reporter: {e}")
             
     async def _handle_warning(self, warning: EarlyWarningSignal):
         """Handle detected early warning signals"""
-        logger.warning(f"⚠️  COORDINATION WARNING: {warning.signal_type} "
-                      f"(severity: {warning.severity:.2f})")
-        
-        # Log detailed warning information
-        logger.warning(f"   Health: {warning.metrics.coordination_health:.2f}")
-        logger.warning(f"   Variance: {warning.metrics.variance:.1f}")
-        logger.warning(f"   Autocorrelation: {warning.metrics.autocorrelation:.3f}")
-        logger.warning(f"   Response Time: {warning.metrics.response_time:.1f}ms")
-        logger.warning(f"   Agents: {warning.metrics.agent_count}")
+        # One structured record carrying the full metrics
+        logger.warning(_json_record({
+            "evt": "coord_warning",
+            "type": warning.signal_type,
+            "sev": warning.severity,
+            "metrics": warning.metrics,
+            "ts": warning.timestamp
+        }))
         
         # Execute warning callbacks
         for callback in self.warning_callbacks:
@@ -144,8 +246,8 @@ class CoordinationMonitoringSystem:
         
     def get_recent_warnings(self, hours: int = 1) -> List[EarlyWarningSignal]:
         """Get warnings from the last N hours"""
-        cutoff = datetime.now() - timedelta(hours=hours)
-        return [w for w in self.monitor.warnings if w.timestamp > cutoff]
+        cutoff_ns = time.time_ns() - hours * 3_600_000_000_000
+        return self.monitor.warnings_since(cutoff_ns)
 
 # Example warning handler
 async def post_warning_to_farcaster(warning: EarlyWarningSignal):
@@ -212,6 +314,6 @@ if __name__ == "__main__":
     import sys
     
     if len(sys.argv) > 1 and sys.argv[1] == "test":
-        asyncio.run(test_mode())
+        run(test_mode())
     else:
-        asyncio.run(run_monitoring_system())
\ No newline at end of file
+        run(run_monitoring_system())
\ No newline at end of file
@@ -0,0 +1,92 @@
+"""
+Server-Sent Events parsing
+Incremental parser for text/event-stream responses such as MCP SSE endpoints.
+Events are dispatched as soon as their terminating blank line arrives; nothing
+beyond the event currently being read is buffered.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import AsyncIterable, AsyncIterator, List, Optional
+
+@dataclass(slots=True)
+class SSEMessage:
+    """One dispatched SSE event"""
+    data: str
+    event: str = "message"
+    id: Optional[str] = None
+    retry: Optional[int] = None  # milliseconds
+    recv_start_ns: int = 0  # perf_counter_ns when the event's first line arrived
+    recv_end_ns: int = 0  # perf_counter_ns when the event was dispatched
+
+class SSEParser:
+    """Line-at-a-time SSE parser following the WHATWG event-stream rules"""
+
+    def __init__(self):
+        self.last_event_id: Optional[str] = None  # Persists across events
+        self._reset()
+
+    def _reset(self):
+        self._data: List[str] = []
+        self._event = ""
+        self._retry: Optional[int] = None
+        self._start_ns = 0
+
+    def feed_line(self, line: str) -> Optional[SSEMessage]:
+        """Consume one line (without its terminator); returns an event when one completes"""
+        if not line:
+            return self._dispatch()
+        if not self._start_ns:
+            self._start_ns = time.perf_counter_ns()
+        if line[0] == ":":
+            return None  # Comment / keep-alive
+
+        name, sep, value = line.partition(":")
+        if sep and value[:1] == " ":
+            value = value[1:]
+
+        if name == "data":
+            self._data.append(value)
+        elif name == "event":
+            self._event = value
+        elif name == "id":
+            if "\0" not in value:
+                self.last_event_id = value
+        elif name == "retry":
+            if value.isdigit():
+                self._retry = int(value)
+        return None
+
+    def _dispatch(self) -> Optional[SSEMessage]:
+        if not self._data:
+            # Nothing to deliver (e.g. a block of only comments or an id)
+            self._reset()
+            return None
+
+        message = SSEMessage(
+            data="\n".join(self._data),
+            event=self._event or "message",
+            id=self.last_event_id,
+            retry=self._retry,
+            recv_start_ns=self._start_ns,
+            recv_end_ns=time.perf_counter_ns()
+        )
+        self._reset()
+        return message
+
+def parse_sse_message(raw: str) -> Optional[SSEMessage]:
+    """Parse a single complete event block; None if it carries no data"""
+    parser = SSEParser()
+    for line in raw.splitlines():
+        message = parser.feed_line(line)
+        if message:
+            return message
+    return parser.feed_line("")
+
+async def iter_sse_messages(lines: AsyncIterable[str]) -> AsyncIterator[SSEMessage]:
+    """Yield events from a stream of lines (e.g. httpx Response.aiter_lines()) as they complete"""
+    parser = SSEParser()
+    async for line in lines:
+        message = parser.feed_line(line.rstrip("\r\n"))
+        if message:
+            yield message
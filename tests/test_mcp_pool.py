@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+from mcp_production_bridge import FarcasterMCPPool
+
+
+class FakeConnection:
+    """Stands in for an MCPConnection without a node process"""
+
+    def __init__(self):
+        self.uses = 0
+        self.alive = True
+
+    async def close(self):
+        self.alive = False
+
+
+class FakePool(FarcasterMCPPool):
+    async def _spawn(self):
+        conn = FakeConnection()
+        self._conns.add(conn)
+        await asyncio.sleep(0)
+        return conn
+
+
+@pytest.mark.asyncio
+async def test_waiter_respawns_when_holder_fails():
+    pool = FakePool("unused", min_size=0, max_size=1)
+    holder_in = asyncio.Event()
+    release = asyncio.Event()
+
+    async def holder():
+        async with pool.acquire():
+            holder_in.set()
+            await release.wait()
+            raise BrokenPipeError("MCP server went away")
+
+    async def waiter():
+        async with pool.acquire() as conn:
+            return conn
+
+    holder_task = asyncio.create_task(holder())
+    await holder_in.wait()
+    waiter_task = asyncio.create_task(waiter())
+    await asyncio.sleep(0.01)
+    assert not waiter_task.done()
+
+    release.set()
+    with pytest.raises(BrokenPipeError):
+        await holder_task
+    conn = await asyncio.wait_for(waiter_task, 1)
+    assert conn.alive
+    assert pool.size == 1
+
+
+@pytest.mark.asyncio
+async def test_dead_idle_connection_is_replaced():
+    pool = FakePool("unused", min_size=0, max_size=1)
+    async with pool.acquire() as first:
+        pass
+    first.alive = False
+
+    async with pool.acquire() as conn:
+        assert conn is not first
+        assert conn.alive
+    assert pool.size == 1